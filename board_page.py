@@ -0,0 +1,119 @@
+import json
+import os
+from datetime import datetime, timedelta
+
+from flight_store import BOARDS
+from flight_records import RECORD_TYPES, InvalidFlightError, create_flight_id
+
+FLIGHT_ROWS = 'div.data.flightlist > a.flightlist__item.display-lg'
+# The origin/destination cell is laid out differently on arrival and departure boards
+PLACE_SELECTORS = {
+    "arrival": 'div.airport-name > span',
+    "departure": 'div.airport-name',
+}
+# Number of days scraped per run, starting today
+DEFAULT_DAYS = int(os.environ.get("SCRAPE_DAYS", "2"))
+# Earlier times within this window are still the same day; anything earlier belongs to the next day
+TIME_THRESHOLD = timedelta(hours=2)
+
+# Reads the rows from index `start` on in one round trip
+EXTRACT_ROWS_JS = """
+(function (start, placeSelector) {
+    const text = (root, selector) => {
+        const el = root.querySelector(selector);
+        return el ? el.innerText.trim() : null;
+    };
+    const items = document.querySelectorAll(%s);
+    const rows = [];
+    for (let i = start; i < items.length; i++) {
+        const item = items[i];
+        rows.push({
+            time: text(item, 'div.flightlist__item-time'),
+            previous_time: text(item, 'div.flightlist__item-time span.previous-time'),
+            flight_number: text(item, 'span.airport__flight-number'),
+            airline_name: text(item, 'span.airport__name'),
+            place: text(item, placeSelector),
+            terminal: text(item, 'div.flightlist__item-terminal'),
+            belt_number: text(item, 'div.flightlist__item-boarding div span.belt'),
+            gate_number: text(item, 'div.flightlist__item-boarding div:nth-child(2) span.gate'),
+            flight_status: text(item, 'div.flightlist__item-status .status'),
+        });
+    }
+    return {count: items.length, rows: rows};
+})
+""" % json.dumps(FLIGHT_ROWS)
+
+# Empties the rows before index `end` once they have been read. The row elements themselves
+# stay, so the list React appends to and the row indices are unchanged.
+PRUNE_ROWS_JS = """
+(function (end) {
+    const items = document.querySelectorAll(%s);
+    let pruned = 0;
+    for (let i = 0; i < Math.min(end, items.length); i++) {
+        if (items[i].firstChild) {
+            items[i].textContent = '';
+            pruned++;
+        }
+    }
+    return pruned;
+})
+""" % json.dumps(FLIGHT_ROWS)
+
+
+def board_kind(board):
+    """Returns 'arrival' or 'departure' for a board."""
+    return BOARDS[board]["time_field"].split("_")[1]
+
+
+def build_flight(board, date, row):
+    """Turns a raw board row into (record, scheduled datetime).
+
+    A row holds the text of the cells read by EXTRACT_ROWS_JS, with None for missing cells.
+    Returns None for rows whose time cannot be parsed.
+    """
+    record_type = RECORD_TYPES[board]
+    kind = board_kind(board)
+
+    time_text = row["time"] or ""
+    if row["previous_time"]:
+        unmodified_time = row["previous_time"]
+        updated_time = time_text.replace(unmodified_time, "").strip()
+    else:
+        unmodified_time = updated_time = time_text
+
+    if '(+1d)' in updated_time:
+        flight_date = date + timedelta(days=1)
+        updated_time = updated_time.replace('(+1d)', '').strip()
+    else:
+        flight_date = date
+
+    try:
+        actual_time = datetime.strptime(updated_time, '%H:%M').time()
+        scheduled_time = datetime.strptime(unmodified_time, '%H:%M').time()
+    except ValueError as e:
+        print(f"Skipping flight with unparseable time {updated_time!r}: {e}")
+        return None
+
+    actual_datetime = datetime.combine(flight_date, actual_time)
+    scheduled_datetime = datetime.combine(date, scheduled_time)
+    scheduled_str = scheduled_datetime.strftime('%Y-%m-%d %H:%M:%S')
+
+    for name in ("flight_number", "airline_name", "place", "flight_status"):
+        if row[name] is None:
+            raise InvalidFlightError(f"Row at {scheduled_str} has no {name}")
+
+    values = {
+        "flight_id": create_flight_id(row["flight_number"], scheduled_str),
+        "flight_number": row["flight_number"],
+        "type": record_type.FLIGHT_TYPE,
+        f"original_{kind}_time": scheduled_str,
+        f"actual_{kind}_time": actual_datetime.strftime('%Y-%m-%d %H:%M:%S'),
+        "airline_name": row["airline_name"],
+        "origin_country": row["place"],
+        "destination": row["place"],
+        "terminal": row["terminal"] or 'Unknown',
+        "belt_number": row["belt_number"] or 'Unknown',
+        "gate_number": row["gate_number"] or 'Unknown',
+        "flight_status": row["flight_status"],
+    }
+    return record_type(**{name: values[name] for name in record_type.__slots__}), scheduled_datetime
@@ -0,0 +1,84 @@
+import os
+
+# Chrome is restarted once the browser's processes use more memory than this, in MB
+MAX_BROWSER_RSS_MB = int(os.environ.get("MAX_BROWSER_RSS_MB", "1500"))
+# ... or once the page holds more DOM nodes than this, detached nodes included
+MAX_DOM_NODES = int(os.environ.get("MAX_DOM_NODES", "150000"))
+# A tab of a shared browser is reloaded once its page's JS heap is larger than this, in MB
+MAX_TAB_HEAP_MB = int(os.environ.get("MAX_TAB_HEAP_MB", "512"))
+# Rows read between two restarts at least; a budget below what a fresh page needs would
+# otherwise restart after every page and page back to the cursor each time
+MIN_ROWS_BETWEEN_RESTARTS = int(os.environ.get("MIN_ROWS_BETWEEN_RESTARTS", "500"))
+
+
+def process_tree_rss(pid):
+    """Returns the resident memory in MB of a process and all its descendants.
+
+    Chrome runs the browser, GPU, network and renderer in separate processes, so the whole
+    tree is counted. Shared pages are counted once per process, which overestimates a
+    little. Returns None where /proc is not available.
+    """
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return None
+
+    children = {}
+    rss_pages = {}
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as stat_file:
+                stat = stat_file.read()
+        except OSError:
+            continue
+        # The command name is wrapped in parentheses and may itself contain spaces
+        fields = stat[stat.rfind(")") + 2:].split()
+        children.setdefault(int(fields[1]), []).append(int(entry))
+        rss_pages[int(entry)] = int(fields[21])
+
+    if pid not in rss_pages:
+        return None
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        total += rss_pages.get(current, 0)
+        pending.extend(children.get(current, ()))
+    return total * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def page_metric(metrics, name):
+    """Returns one value from the metrics of a Performance.getMetrics call, or 0 if it is missing."""
+    for metric in metrics:
+        if metric["name"] == name:
+            return metric["value"]
+    return 0
+
+
+def dom_nodes(metrics):
+    return int(page_metric(metrics, "Nodes"))
+
+
+def js_heap_mb(metrics):
+    return page_metric(metrics, "JSHeapUsedSize") / (1024 * 1024)
+
+
+def over_budget(rss_mb, nodes):
+    """Whether a browser using `rss_mb` MB for a page of `nodes` DOM nodes should be restarted."""
+    return (rss_mb is not None and rss_mb > MAX_BROWSER_RSS_MB) or nodes > MAX_DOM_NODES
+
+
+def tab_over_budget(heap_mb, nodes):
+    """Whether one tab of a shared browser, with a `heap_mb` MB JS heap and `nodes` DOM nodes, should be reloaded.
+
+    The browser's RSS is shared by every tab, so reloading one tab cannot bring it down;
+    only the tab's own page metrics are checked.
+    """
+    return heap_mb > MAX_TAB_HEAP_MB or nodes > MAX_DOM_NODES
+
+
+def restart_due(over, index, restarted_at):
+    """Whether to restart at row `index`: over budget, and enough rows read since the restart at `restarted_at`."""
+    return over and (restarted_at is None or index - restarted_at >= MIN_ROWS_BETWEEN_RESTARTS)
@@ -0,0 +1,753 @@
+import argparse
+import asyncio
+import base64
+import itertools
+import json
+import os
+import shutil
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+import websockets
+
+from flight_store import BOARDS
+from flight_records import RECORD_TYPES, InvalidFlightError, create_flight_id, merge_into_store, parse_flight_time
+from scrape_checkpoint import ScrapeCheckpoint
+from chrome_profile import discard_profile, ensure_profile, profile_args, profile_dir
+from retry_policy import CIRCUIT_OPEN_EXIT_CODE, CircuitBreaker, CircuitOpenError, StageError, retry_async, stage_timeout
+from browser_memory import dom_nodes, js_heap_mb, restart_due, tab_over_budget
+from board_page import DEFAULT_DAYS, EXTRACT_ROWS_JS, FLIGHT_ROWS, PLACE_SELECTORS, PRUNE_ROWS_JS, TIME_THRESHOLD, board_kind, build_flight
+
+# Same flags as the Selenium scrapers, plus the ones that keep background tabs running at full speed
+CHROME_ARGS = [
+    "--headless=new",
+    "--disable-gpu",
+    "--window-size=1920,1080",
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-extensions",
+    "--disable-background-timer-throttling",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-renderer-backgrounding",
+    "--no-first-run",
+    "--no-default-browser-check",
+]
+
+# Candidate keys for each field of a flight in the JSON the board page fetches; the first one present wins
+FEED_FIELDS = {
+    "flight_number": ("flight_number", "flightNumber", "flightNo", "flight_no"),
+    "scheduled": ("scheduled_datetime", "scheduledDatetime", "scheduled_timestamp", "scheduledTime", "scheduled"),
+    "scheduled_date": ("scheduled_date", "scheduledDate"),
+    "scheduled_time": ("scheduled_time",),
+    "actual": ("actual_timestamp", "estimated_timestamp", "display_timestamp", "actual_datetime", "estimated_datetime", "actualDatetime", "estimatedDatetime"),
+    "airline_name": ("airline_name", "airlineName", "airline_details.name", "airline.name", "airline"),
+    "terminal": ("display_terminal", "terminal"),
+    "belt_number": ("display_belt", "belt", "baggage_belt"),
+    "gate_number": ("display_gate", "gate"),
+    "flight_status": ("flight_status", "status_mapping.listing_description_en", "flightStatus", "status"),
+}
+FEED_PLACE_FIELDS = {
+    "arrival": ("origin_name", "originName", "airport_details.city", "airport_details.name", "origin"),
+    "departure": ("destination_name", "destinationName", "airport_details.city", "airport_details.name", "destination"),
+}
+# Share of unreadable flights in a date's feed past which FEED_FIELDS is taken not to match
+# what the site sends, and the date is read from the page instead
+FEED_MAX_REJECTED_SHARE = 0.5
+# Times on the boards are Singapore time
+BOARD_TIMEZONE = timezone(timedelta(hours=8))
+
+class CDPError(Exception):
+    """Raised when Chrome reports an error for a DevTools command or cannot be started."""
+
+
+# Failures of a page operation that are worth retrying: protocol errors and waits that ran out
+TRANSIENT_ERRORS = (CDPError, asyncio.TimeoutError)
+
+
+def find_chrome():
+    """Returns the Chrome binary, preferring $CHROME_BIN."""
+    for name in (os.environ.get("CHROME_BIN"), "google-chrome", "google-chrome-stable", "chromium", "chromium-browser"):
+        if name and shutil.which(name):
+            return shutil.which(name)
+    raise CDPError("Chrome not found; set CHROME_BIN to the Chrome binary")
+
+
+class Browser:
+    """A headless Chrome process driven over a single DevTools websocket."""
+
+    def __init__(self, chrome_path=None, extra_args=(), profile=None):
+        self.chrome_path = chrome_path
+        self.extra_args = list(extra_args)
+        # A persistent profile keeps the site's bundles in Chrome's HTTP cache between runs
+        self.profile = profile
+        self.process = None
+        self.profile_dir = None
+        self.ws = None
+        self.reader = None
+        self.ids = itertools.count(1)
+        self.pending = {}
+        self.handlers = {}
+
+    async def start(self, timeout=30):
+        if self.profile is None:
+            self.profile_dir = tempfile.mkdtemp(prefix="cdp-profile-")
+            port = await self._launch([f"--user-data-dir={self.profile_dir}"], timeout)
+        else:
+            ensure_profile(self.profile)
+            try:
+                port = await self._launch(profile_args(self.profile), timeout)
+            except CDPError as e:
+                # A profile Chrome cannot start with is thrown away rather than failing every run
+                print(f"Chrome failed to start with profile {self.profile}: {e}")
+                discard_profile(self.profile)
+                port = await self._launch(profile_args(self.profile), timeout)
+
+        self.ws = await websockets.connect(f"ws://127.0.0.1:{port[0]}{port[1]}", max_size=None, ping_interval=None)
+        self.reader = asyncio.create_task(self._read_loop())
+
+    async def _launch(self, profile_arguments, timeout):
+        """Starts Chrome and returns (port, browser endpoint path) of its DevTools server."""
+        user_data_dir = self.profile_dir or self.profile
+        self.process = await asyncio.create_subprocess_exec(
+            self.chrome_path or find_chrome(),
+            *CHROME_ARGS,
+            *self.extra_args,
+            "--remote-debugging-port=0",
+            *profile_arguments,
+            "about:blank",
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+
+        # Chrome writes the port it picked and the browser endpoint path once DevTools is listening
+        port_file = os.path.join(user_data_dir, "DevToolsActivePort")
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            if self.process.returncode is not None:
+                raise CDPError(f"Chrome exited with code {self.process.returncode} during startup")
+            if os.path.exists(port_file):
+                with open(port_file) as f:
+                    lines = f.read().split()
+                if len(lines) >= 2:
+                    return lines[0], lines[1]
+            if loop.time() > deadline:
+                self.process.kill()
+                await self.process.wait()
+                raise CDPError("Timed out waiting for Chrome DevTools to start")
+            await asyncio.sleep(0.05)
+
+    async def _read_loop(self):
+        try:
+            async for message in self.ws:
+                msg = json.loads(message)
+                if "id" in msg:
+                    future = self.pending.pop(msg["id"], None)
+                    if future is None or future.done():
+                        continue
+                    if "error" in msg:
+                        future.set_exception(CDPError(f"{msg['error'].get('message')} ({msg['error'].get('code')})"))
+                    else:
+                        future.set_result(msg.get("result", {}))
+                else:
+                    for callback in self.handlers.get((msg.get("sessionId"), msg["method"]), []):
+                        callback(msg.get("params", {}))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(CDPError("DevTools connection closed"))
+            self.pending.clear()
+
+    async def send(self, method, params=None, session_id=None, timeout=30):
+        """Sends a DevTools command and returns its result."""
+        message = {"id": next(self.ids), "method": method, "params": params or {}}
+        if session_id is not None:
+            message["sessionId"] = session_id
+        future = asyncio.get_running_loop().create_future()
+        self.pending[message["id"]] = future
+        await self.ws.send(json.dumps(message))
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self.pending.pop(message["id"], None)
+
+    def subscribe(self, session_id, method, callback):
+        """Calls callback(params) for every `method` event of the given session."""
+        self.handlers.setdefault((session_id, method), []).append(callback)
+
+    def unsubscribe_session(self, session_id):
+        for key in [key for key in self.handlers if key[0] == session_id]:
+            del self.handlers[key]
+
+    async def new_tab(self):
+        target = await self.send("Target.createTarget", {"url": "about:blank"})
+        attached = await self.send("Target.attachToTarget", {"targetId": target["targetId"], "flatten": True})
+        return Tab(self, target["targetId"], attached["sessionId"])
+
+    async def close(self):
+        if self.ws is not None:
+            try:
+                await self.send("Browser.close", timeout=5)
+            except (CDPError, asyncio.TimeoutError, websockets.ConnectionClosed):
+                pass
+            await self.ws.close()
+        if self.reader is not None:
+            await self.reader
+        if self.process is not None and self.process.returncode is None:
+            try:
+                await asyncio.wait_for(self.process.wait(), 10)
+            except asyncio.TimeoutError:
+                self.process.kill()
+                await self.process.wait()
+        if self.profile_dir is not None:
+            shutil.rmtree(self.profile_dir, ignore_errors=True)
+
+
+class Tab:
+    """One page target of the browser, addressed through its flattened session."""
+
+    def __init__(self, browser, target_id, session_id):
+        self.browser = browser
+        self.target_id = target_id
+        self.session_id = session_id
+        self.metrics_enabled = False
+
+    async def send(self, method, params=None, timeout=30):
+        return await self.browser.send(method, params, self.session_id, timeout)
+
+    async def evaluate(self, expression):
+        """Evaluates a JS expression in the page and returns its value."""
+        result = await self.send("Runtime.evaluate", {"expression": expression, "returnByValue": True, "awaitPromise": True})
+        if "exceptionDetails" in result:
+            details = result["exceptionDetails"]
+            raise CDPError(details.get("exception", {}).get("description") or details.get("text"))
+        return result["result"].get("value")
+
+    async def wait_for(self, expression, timeout, interval=0.1):
+        """Polls a JS expression until it is truthy, raising TimeoutError after `timeout` seconds."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            value = await self.evaluate(expression)
+            if value:
+                return value
+            if loop.time() > deadline:
+                raise asyncio.TimeoutError(f"Timed out waiting for {expression}")
+            await asyncio.sleep(interval)
+
+    async def navigate(self, url, timeout=None):
+        timeout = timeout or stage_timeout("navigate")
+        result = await self.send("Page.navigate", {"url": url}, timeout)
+        if result.get("errorText"):
+            raise CDPError(f"Navigation to {url} failed: {result['errorText']}")
+        await self.wait_for(f"document.querySelector({json.dumps('div.data.flightlist')}) !== null", timeout)
+
+    async def choose_date(self, date, timeout=None):
+        """Selects a date from the date picker and waits for the flights list to load."""
+        timeout = timeout or stage_timeout("choose_date")
+        calendar_input = 'div.react-datepicker__input-container input[type="button"]'
+        await self.wait_for(f"document.querySelector({json.dumps(calendar_input)}) !== null", timeout)
+        await self.evaluate(f"(() => {{ const el = document.querySelector({json.dumps(calendar_input)}); el.scrollIntoView(true); el.click(); }})()")
+        await self.wait_for("(() => { const el = document.querySelector('.react-datepicker__month'); return el !== null && el.offsetParent !== null; })()", timeout)
+
+        # Page the picker forward when the date is in a later month than the one shown
+        month_label = date.strftime('%B %Y')
+        for _ in range(3):
+            shown = await self.evaluate("(() => { const el = document.querySelector('.react-datepicker__current-month'); return el ? el.innerText.trim() : null; })()")
+            if shown is None or shown == month_label:
+                break
+            await self.evaluate("(() => { const el = document.querySelector('.react-datepicker__navigation--next'); if (el) el.click(); })()")
+            await asyncio.sleep(0.2)
+
+        day_selector = f".react-datepicker__day--{date.day:03d}:not(.react-datepicker__day--outside-month)"
+        clicked = await self.evaluate(f"(() => {{ const el = document.querySelector({json.dumps(day_selector)}); if (!el) return false; el.scrollIntoView(true); el.click(); return true; }})()")
+        if not clicked:
+            raise CDPError(f"No date picker entry for {date.strftime('%Y-%m-%d')}")
+        await self.wait_for(f"document.querySelector({json.dumps('div.data.flightlist')}) !== null", timeout)
+
+    async def extract_rows(self, start, place_selector):
+        """Returns (number of rows on the page, raw rows from index `start` on)."""
+        result = await self.evaluate(f"{EXTRACT_ROWS_JS}({start}, {json.dumps(place_selector)})")
+        return result["count"], result["rows"]
+
+    async def row_count(self):
+        return await self.evaluate(f"document.querySelectorAll({json.dumps(FLIGHT_ROWS)}).length")
+
+    async def prune_rows(self, end):
+        """Empties the rows before index `end`, which have already been read."""
+        return await self.evaluate(f"{PRUNE_ROWS_JS}({end})")
+
+    async def memory_usage(self):
+        """Returns (JS heap of the page in MB, DOM nodes of the page, detached ones included)."""
+        if not self.metrics_enabled:
+            await self.send("Performance.enable")
+            self.metrics_enabled = True
+        result = await self.send("Performance.getMetrics")
+        return js_heap_mb(result["metrics"]), dom_nodes(result["metrics"])
+
+    async def click_load_more(self, timeout=None):
+        """Clicks "Load more", raising TimeoutError if the button does not show up."""
+        timeout = timeout or stage_timeout("load_more")
+        button = 'a.gray-bg.next-flights'
+        await self.wait_for(f"document.querySelector({json.dumps(button)}) !== null", timeout)
+        await self.evaluate(f"(() => {{ const el = document.querySelector({json.dumps(button)}); el.scrollIntoView(true); el.click(); }})()")
+
+    async def load_more(self, previous_count, timeout=None):
+        """Clicks "Load more" and waits for new rows. Returns False when there is nothing more to load.
+
+        Raises TimeoutError when the button is there but no new rows arrive in time.
+        """
+        try:
+            await self.click_load_more(timeout)
+        except asyncio.TimeoutError:
+            print("No more flights to load")
+            return False
+        await self.wait_for(f"document.querySelectorAll({json.dumps(FLIGHT_ROWS)}).length > {previous_count}", stage_timeout("rows"))
+        return True
+
+    async def close(self):
+        self.browser.unsubscribe_session(self.session_id)
+        try:
+            await self.browser.send("Target.closeTarget", {"targetId": self.target_id})
+        except CDPError:
+            pass
+
+
+class ResponseCapture:
+    """Collects the JSON bodies of the XHR/fetch responses a tab receives."""
+
+    def __init__(self, tab):
+        self.tab = tab
+        self.pending = {}
+        self.tasks = []
+        self.bodies = []
+        self.arrived = asyncio.Event()
+
+    async def start(self):
+        browser, session_id = self.tab.browser, self.tab.session_id
+        browser.subscribe(session_id, "Network.responseReceived", self._on_response)
+        browser.subscribe(session_id, "Network.loadingFinished", self._on_finished)
+        await self.tab.send("Network.enable")
+
+    def _on_response(self, params):
+        if params.get("type") in ("XHR", "Fetch") and "json" in params["response"].get("mimeType", ""):
+            self.pending[params["requestId"]] = params["response"]["url"]
+
+    def _on_finished(self, params):
+        # The body can only be read once the response has finished loading
+        if self.pending.pop(params["requestId"], None) is not None:
+            self.tasks.append(asyncio.create_task(self._fetch(params["requestId"])))
+
+    async def _fetch(self, request_id):
+        try:
+            result = await self.tab.send("Network.getResponseBody", {"requestId": request_id})
+        except CDPError:
+            return
+        body = result["body"]
+        if result.get("base64Encoded"):
+            body = base64.b64decode(body)
+        try:
+            self.bodies.append(json.loads(body))
+        except ValueError:
+            return
+        self.arrived.set()
+
+    async def settle(self):
+        """Waits until every finished response has been read."""
+        while self.tasks:
+            tasks, self.tasks = self.tasks, []
+            await asyncio.gather(*tasks)
+
+    def take(self):
+        """Returns the bodies collected since the last call and forgets them."""
+        bodies, self.bodies = self.bodies, []
+        return bodies
+
+    async def wait_for_response(self, timeout):
+        """Waits for the next JSON response, raising TimeoutError if none arrives."""
+        self.arrived.clear()
+        await asyncio.wait_for(self.arrived.wait(), timeout)
+        await self.settle()
+
+
+def feed_value(item, keys):
+    """Returns the first present, non-empty value among dotted keys of a feed item."""
+    for key in keys:
+        value = item
+        for part in key.split("."):
+            value = value.get(part) if isinstance(value, dict) else None
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def parse_feed_time(value):
+    """Parses an ISO string or epoch timestamp from the feed into naive Singapore time."""
+    if isinstance(value, (int, float)):
+        # Epoch timestamps are in milliseconds in JS payloads
+        moment = datetime.fromtimestamp(value / 1000 if value > 1e11 else value, BOARD_TIMEZONE)
+    else:
+        moment = datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(BOARD_TIMEZONE).replace(tzinfo=None)
+    return moment
+
+
+def feed_items(payload):
+    """Yields every flight-like object found anywhere in a feed payload."""
+    if isinstance(payload, list):
+        for value in payload:
+            yield from feed_items(value)
+    elif isinstance(payload, dict):
+        if feed_value(payload, FEED_FIELDS["flight_number"]) is not None and (
+            feed_value(payload, FEED_FIELDS["scheduled"]) is not None
+            or feed_value(payload, FEED_FIELDS["scheduled_date"]) is not None
+        ):
+            yield payload
+            return
+        for value in payload.values():
+            yield from feed_items(value)
+
+
+def flight_from_feed(board, item):
+    """Turns a flight object from the page's own feed into (record, scheduled datetime).
+
+    The feed carries full dates, so unlike build_flight there is no "(+1d)" or
+    previous-time parsing. Returns None for items without a usable schedule, and raises
+    InvalidFlightError for items without an airline, origin/destination or status.
+    """
+    record_type = RECORD_TYPES[board]
+    kind = board_kind(board)
+
+    try:
+        scheduled = feed_value(item, FEED_FIELDS["scheduled"])
+        if scheduled is None:
+            date_part = feed_value(item, FEED_FIELDS["scheduled_date"])
+            time_part = feed_value(item, FEED_FIELDS["scheduled_time"]) or "00:00"
+            scheduled = f"{date_part} {time_part}"
+        scheduled_datetime = parse_feed_time(scheduled).replace(second=0, microsecond=0)
+        actual = feed_value(item, FEED_FIELDS["actual"])
+        actual_datetime = parse_feed_time(actual).replace(second=0, microsecond=0) if actual else scheduled_datetime
+    except (TypeError, ValueError, OverflowError, OSError):
+        return None
+
+    scheduled_str = scheduled_datetime.strftime('%Y-%m-%d %H:%M:%S')
+    flight_number = str(feed_value(item, FEED_FIELDS["flight_number"]))
+    airline_name = feed_value(item, FEED_FIELDS["airline_name"])
+    place = feed_value(item, FEED_PLACE_FIELDS[kind])
+    flight_status = feed_value(item, FEED_FIELDS["flight_status"])
+    for name, value in (("airline_name", airline_name), ("place", place), ("flight_status", flight_status)):
+        if value is None:
+            raise InvalidFlightError(f"Feed flight {flight_number} at {scheduled_str} has no {name}")
+
+    gate_number = str(feed_value(item, FEED_FIELDS["gate_number"]) or 'Unknown')
+    # The boards show the new time or gate next to some statuses, e.g. "LANDED 14:23"
+    flight_status = str(flight_status).strip().upper()
+    if flight_status in ("LANDED", "CONFIRMED"):
+        flight_status = f"{flight_status} {actual_datetime.strftime('%H:%M')}"
+    elif flight_status == "NEW GATE" and gate_number != 'Unknown':
+        flight_status = f"{flight_status} {gate_number}"
+
+    values = {
+        "flight_id": create_flight_id(flight_number, scheduled_str),
+        "flight_number": flight_number,
+        "type": record_type.FLIGHT_TYPE,
+        f"original_{kind}_time": scheduled_str,
+        f"actual_{kind}_time": actual_datetime.strftime('%Y-%m-%d %H:%M:%S'),
+        "airline_name": str(airline_name),
+        "origin_country": str(place),
+        "destination": str(place),
+        "terminal": str(feed_value(item, FEED_FIELDS["terminal"]) or 'Unknown'),
+        "belt_number": str(feed_value(item, FEED_FIELDS["belt_number"]) or 'Unknown'),
+        "gate_number": gate_number,
+        "flight_status": flight_status,
+    }
+    return record_type(**{name: values[name] for name in record_type.__slots__}), scheduled_datetime
+
+
+def flights_from_feed(board, payloads):
+    """Decodes the captured payloads into {flight_id: (record, scheduled datetime)}; later responses win.
+
+    Also returns the number of flight items seen and the number that could not be read.
+    """
+    flights = {}
+    items = rejected = 0
+    for payload in payloads:
+        for item in feed_items(payload):
+            items += 1
+            try:
+                built = flight_from_feed(board, item)
+            except InvalidFlightError as e:
+                print(f"Skipping invalid flight: {e}")
+                built = None
+            if built is None:
+                rejected += 1
+                continue
+            flights[built[0].flight_id] = built
+    return flights, items, rejected
+
+
+async def open_board(tab, board, breaker=None):
+    """Loads the board's flight page, retrying failed loads."""
+    await retry_async("navigate", lambda: tab.navigate(BOARDS[board]["url"]), TRANSIENT_ERRORS, breaker)
+
+
+async def select_date(tab, board, date, breaker=None):
+    """Chooses a date, reloading the board page before each retry."""
+    await retry_async("choose_date", lambda: tab.choose_date(date), TRANSIENT_ERRORS, breaker,
+                      recover=lambda: tab.navigate(BOARDS[board]["url"]))
+
+
+async def load_more(tab, previous_count, breaker=None):
+    return await retry_async("load_more", lambda: tab.load_more(previous_count), TRANSIENT_ERRORS, breaker)
+
+
+async def open_date(tab, board, date, index=0, breaker=None):
+    """Loads a date on a fresh page and pages it up to row `index`, pruning on the way."""
+    await open_board(tab, board, breaker)
+    await select_date(tab, board, date, breaker)
+    count = await tab.row_count()
+    while count < index:
+        await tab.prune_rows(count)
+        if not await load_more(tab, count, breaker):
+            break
+        count = await tab.row_count()
+
+
+async def scrape_date(tab, board, date, checkpoint=None, breaker=None):
+    """Scrapes all flights of one date on a board, in board order.
+
+    With a checkpoint, every page is saved to it, and a date a failed run left unfinished
+    is resumed from its cursor instead of being read again from the top. Raises StageError
+    when a stage still fails after its retries.
+    """
+    kind = board_kind(board)
+    date_key = date.strftime('%Y-%m-%d')
+    flights = []
+    last_time = None
+    index = 0
+    if checkpoint is not None:
+        done, index, last_time = checkpoint.cursor(date_key)
+        flights = checkpoint.records(date_key)
+        if done:
+            return flights
+    await open_date(tab, board, date, index, breaker)
+    reloaded_at = None
+
+    while True:
+        count, rows = await retry_async("rows", lambda: tab.extract_rows(index, PLACE_SELECTORS[kind]), TRANSIENT_ERRORS, breaker)
+        stop_loop = False
+        read = len(flights)
+        for row in rows:
+            try:
+                built = build_flight(board, date, row)
+            except InvalidFlightError as e:
+                print(f"Skipping invalid flight: {e}")
+                continue
+            if built is None:
+                continue
+            record, scheduled = built
+            # The list runs on into the next day; an earlier time means we have passed midnight
+            if last_time and scheduled < last_time - TIME_THRESHOLD:
+                stop_loop = True
+                break
+            last_time = scheduled
+            flights.append(record)
+        index = count
+        if checkpoint is not None:
+            checkpoint.save_page(date_key, flights[read:], index, last_time, done=stop_loop)
+        if stop_loop:
+            break
+
+        # Keep the page small, and reload it once it has grown too big anyway
+        await tab.prune_rows(index)
+        heap_mb, nodes = await tab.memory_usage()
+        if restart_due(tab_over_budget(heap_mb, nodes), index, reloaded_at):
+            print(f"Reloading {board} for {date.strftime('%Y-%m-%d')} at {heap_mb:.0f} MB JS heap and {nodes} DOM nodes")
+            await open_date(tab, board, date, index, breaker)
+            reloaded_at = index
+
+        if not await load_more(tab, index, breaker):
+            if checkpoint is not None:
+                checkpoint.save_page(date_key, [], index, last_time, done=True)
+            break
+    return flights
+
+
+async def scrape_horizon_from_feed(tab, board, dates, response_timeout=10, breaker=None):
+    """Scrapes a run of consecutive dates from the page's feed, picking a date only where the feed stops.
+
+    Paging with "Load more" runs on past midnight, so one date pick usually covers several
+    days; the picker is only used again for the first date the feed did not fully reach.
+    Returns the records of all dates, ordered by scheduled time.
+    """
+    capture = ResponseCapture(tab)
+    await capture.start()
+    await open_board(tab, board, breaker)
+    await capture.settle()
+
+    wanted = {date.date() for date in dates}
+    remaining = sorted(dates)
+    collected = {}
+    picks = 0
+    while remaining:
+        date = remaining[0]
+        earlier = capture.take()
+        try:
+            await select_date(tab, board, date, breaker)
+            picks += 1
+        except CircuitOpenError:
+            raise
+        except StageError as e:
+            print(f"Error choosing {date.strftime('%Y-%m-%d')} on {board}: {e}")
+            remaining.pop(0)
+            continue
+        flights = {}
+        latest = None
+        items = rejected = 0
+        try:
+            await capture.wait_for_response(response_timeout)
+        except asyncio.TimeoutError:
+            # The pick fetched nothing new, so the page shows what it had already loaded
+            capture.bodies[:0] = earlier
+
+        while True:
+            # Only the responses of the last page are decoded; earlier pages are already in `flights`
+            page, page_items, page_rejected = flights_from_feed(board, capture.take())
+            flights.update(page)
+            items += page_items
+            rejected += page_rejected
+            for _, scheduled in page.values():
+                if latest is None or scheduled.date() > latest:
+                    latest = scheduled.date()
+            if latest is not None and latest > remaining[-1].date():
+                break
+            try:
+                await tab.click_load_more()
+                await capture.wait_for_response(response_timeout)
+            except asyncio.TimeoutError:
+                break
+
+        if rejected > items * FEED_MAX_REJECTED_SHARE:
+            reason = f"{rejected} of {items} flights in the {board} feed could not be read"
+        elif not any(scheduled.date() == date.date() for _, scheduled in flights.values()):
+            reason = f"No flights found in the {board} feed"
+        else:
+            reason = None
+        if reason:
+            print(f"{reason} for {date.strftime('%Y-%m-%d')}; reading the page instead")
+            time_field = BOARDS[board]["time_field"]
+            flights = {record.flight_id: (record, parse_flight_time(getattr(record, time_field))) for record in await scrape_date(tab, board, date, breaker=breaker)}
+            latest = None
+        collected.update(flights)
+
+        # A date is complete once the feed has moved on to a later one; the last date it reached may be cut short
+        remaining = [day for day in remaining[1:] if latest is None or day.date() >= latest]
+
+    print(f"{board}: {len(dates)} dates from {picks} date picks")
+    in_horizon = [item for item in collected.values() if item[1].date() in wanted]
+    return [record for record, _ in sorted(in_horizon, key=lambda item: item[1])]
+
+
+def split_dates(dates, parts):
+    """Splits dates into at most `parts` runs of consecutive dates."""
+    size = -(-len(dates) // max(1, parts))
+    return [dates[i:i + size] for i in range(0, len(dates), size)]
+
+
+async def scrape_boards(boards, dates, max_tabs=4, browser_args=(), capture=False, profile=None, checkpoints=None, breaker=None):
+    """Scrapes the dates of every board concurrently on one Chrome.
+
+    Without capture every (board, date) pair gets its own tab and is read from the DOM. With
+    capture, flights are read from the page's own JSON responses, and each board's dates are
+    split into runs that are each scraped on one tab from as few date picks as possible.
+    Returns {board: [flight dicts]} with the flights of each board in date order.
+    DOM scrapes save their pages to the board's checkpoint in `checkpoints`, if it has one.
+    All tabs share `breaker`; once it opens, the remaining jobs give up without loading anything.
+    """
+    checkpoints = checkpoints or {}
+    browser = Browser(extra_args=browser_args, profile=profile)
+    await browser.start()
+    semaphore = asyncio.Semaphore(max_tabs)
+
+    async def job(board, run):
+        label = run[0].strftime('%Y-%m-%d') if len(run) == 1 else f"{run[0].strftime('%Y-%m-%d')} to {run[-1].strftime('%Y-%m-%d')}"
+        async with semaphore:
+            tab = await browser.new_tab()
+            try:
+                print(f"Scraping {board} for {label}")
+                if capture:
+                    return await scrape_horizon_from_feed(tab, board, run, breaker=breaker)
+                return await scrape_date(tab, board, run[0], checkpoints.get(board), breaker)
+            except (StageError, *TRANSIENT_ERRORS) as e:
+                print(f"Error scraping {board} for {label}: {e}")
+                # The pages read before the failure are kept in the checkpoint
+                checkpoint = checkpoints.get(board)
+                if checkpoint is None or capture:
+                    return []
+                return checkpoint.records(run[0].strftime('%Y-%m-%d'))
+            finally:
+                await tab.close()
+
+    if capture:
+        runs_per_board = max(1, max_tabs // len(boards))
+        jobs = [(board, run) for board in boards for run in split_dates(dates, runs_per_board)]
+    else:
+        jobs = [(board, [date]) for board in boards for date in dates]
+    try:
+        results = await asyncio.gather(*(job(board, run) for board, run in jobs))
+    finally:
+        await browser.close()
+
+    scraped = {board: [] for board in boards}
+    for (board, _), records in zip(jobs, results):
+        scraped[board].extend(record.to_dict() for record in records)
+    return scraped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape the flight boards concurrently over the Chrome DevTools Protocol.")
+    parser.add_argument("boards", nargs="*", help=f"Boards to scrape (default: all of {', '.join(BOARDS)})")
+    parser.add_argument("--days", type=int, default=DEFAULT_DAYS, help="Number of days to scrape, starting today (default: $SCRAPE_DAYS or 2)")
+    parser.add_argument("--max-tabs", type=int, default=4, help="Number of pages loaded at the same time")
+    parser.add_argument("--capture", action="store_true", help="Read flights from the page's JSON responses instead of the DOM")
+    parser.add_argument("--profile-dir", help="Persistent Chrome profile root, kept between runs (default: $CHROME_PROFILE_DIR)")
+    parser.add_argument("--data-dir", default=".")
+    args = parser.parse_args()
+    unknown = [board for board in args.boards if board not in BOARDS]
+    if unknown:
+        parser.error(f"unknown board: {', '.join(unknown)}")
+    boards = args.boards or list(BOARDS)
+
+    start_date = datetime.today()
+    dates = [start_date + timedelta(days=day) for day in range(args.days)]
+    date_keys = [date.strftime('%Y-%m-%d') for date in dates]
+    profile = profile_dir("cdp_engine", args.profile_dir)
+    # Capture mode reads whole runs of dates from the feed at once, so only DOM scrapes have a page cursor
+    checkpoints = {} if args.capture else {board: ScrapeCheckpoint.load(board, date_keys, args.data_dir) for board in boards}
+    breaker = CircuitBreaker()
+    scraped = asyncio.run(scrape_boards(boards, dates, args.max_tabs, capture=args.capture, profile=profile,
+                                        checkpoints=checkpoints, breaker=breaker))
+
+    for board in boards:
+        records = [RECORD_TYPES[board](**flight) for flight in scraped[board]]
+        merge_into_store(board, records, date_keys, args.data_dir)
+        checkpoint = checkpoints.get(board)
+        if checkpoint is not None and checkpoint.complete():
+            checkpoint.clear()
+        elif checkpoint is not None:
+            print(f"Some {board} dates were cut short; a retry of this run resumes them from {checkpoint.path}")
+
+    # What was read before the breaker opened has been merged; the run still fails
+    try:
+        breaker.check()
+    except CircuitOpenError as e:
+        print(f"Stopped scraping: {e}", file=sys.stderr)
+        raise SystemExit(CIRCUIT_OPEN_EXIT_CODE)
+
+
+if __name__ == "__main__":
+    main()
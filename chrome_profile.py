@@ -0,0 +1,84 @@
+import json
+import os
+import shutil
+
+# Persistent Chrome profile root; unset means every run starts from a fresh temporary profile
+PROFILE_ROOT = os.environ.get("CHROME_PROFILE_DIR")
+# Upper bound for Chrome's HTTP disk cache in each profile
+CACHE_SIZE_MB = int(os.environ.get("CHROME_CACHE_SIZE_MB", "200"))
+
+# Left behind by a Chrome that did not shut down cleanly; Chrome refuses to start while they exist
+LOCK_FILES = ("SingletonLock", "SingletonSocket", "SingletonCookie", "DevToolsActivePort")
+# Files Chrome rewrites on every run; if they no longer parse, the profile is damaged
+JSON_FILES = ("Local State", os.path.join("Default", "Preferences"))
+CACHE_DIRS = (os.path.join("Default", "Cache"), os.path.join("Default", "Code Cache"))
+
+
+def profile_dir(name, root=None):
+    """Returns the persistent profile directory for a scraper, or None when profiles are not enabled.
+
+    Each scraper gets its own profile because Chrome locks a profile to one running browser.
+    """
+    root = root or PROFILE_ROOT
+    if not root:
+        return None
+    return os.path.join(os.path.abspath(root), name)
+
+
+def directory_size(path):
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                total += os.lstat(os.path.join(dirpath, filename)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def discard_profile(path):
+    print(f"Discarding Chrome profile {path}")
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def ensure_profile(path, cache_size_mb=None):
+    """Prepares a persistent profile for launch, discarding it if it is damaged.
+
+    Stale lock files are removed. A cache that has grown past twice its limit, for example
+    one restored from an older CI cache, is cleared. A profile whose JSON state files no
+    longer parse is deleted and recreated empty.
+    """
+    cache_size_mb = CACHE_SIZE_MB if cache_size_mb is None else cache_size_mb
+    os.makedirs(path, exist_ok=True)
+
+    for name in JSON_FILES:
+        state_path = os.path.join(path, name)
+        if not os.path.exists(state_path):
+            continue
+        try:
+            with open(state_path, "rb") as state_file:
+                json.load(state_file)
+        except (OSError, ValueError):
+            discard_profile(path)
+            return
+
+    for name in LOCK_FILES:
+        lock_path = os.path.join(path, name)
+        if os.path.lexists(lock_path):
+            os.unlink(lock_path)
+
+    cache_bytes = sum(directory_size(os.path.join(path, name)) for name in CACHE_DIRS)
+    if cache_bytes > 2 * cache_size_mb * 1024 * 1024:
+        print(f"Clearing {cache_bytes // (1024 * 1024)} MB Chrome cache in {path}")
+        for name in CACHE_DIRS:
+            shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+
+
+def profile_args(path, cache_size_mb=None):
+    """Returns the Chrome arguments that point it at a persistent profile and bounded disk cache."""
+    cache_size_mb = CACHE_SIZE_MB if cache_size_mb is None else cache_size_mb
+    return [
+        f"--user-data-dir={path}",
+        f"--disk-cache-size={cache_size_mb * 1024 * 1024}",
+    ]
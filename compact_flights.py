@@ -0,0 +1,113 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from flight_store import BOARDS, load_board, load_shard, save_shards, shard_dates, shard_dir, shard_path
+from flight_rollups import update_rollups
+from flight_records import RECORD_TYPES, InvalidFlightError, create_flight_id, merge_flight
+
+
+def compact_shard(board, flights):
+    """Normalises ids and drops invalid and superseded flights of one date.
+
+    A later copy of a flight in the archive replaces an earlier one wherever merging it from
+    a scrape would (see merge_flight), so a copy that went back to ON SCHEDULE does not undo
+    a settled status. The kept copy takes the place of the first one. Returns the kept
+    flights in archive order, plus the number of invalid flights, duplicates and rewritten ids.
+    """
+    record_type = RECORD_TYPES[board]
+    time_field = BOARDS[board]["time_field"]
+    records = {}
+    kept = {}
+    invalid = duplicates = renamed = 0
+
+    for flight in flights:
+        flight_id = create_flight_id(flight.get('flight_number', ''), flight.get(time_field, ''))
+        legacy = flight.get('flight_id') != flight_id
+        if legacy:
+            flight = dict(flight, flight_id=flight_id)
+        try:
+            record = record_type(**flight)
+        except (InvalidFlightError, TypeError):
+            invalid += 1
+            continue
+        if legacy:
+            renamed += 1
+
+        if flight_id not in records:
+            records[flight_id] = record
+            kept[flight_id] = flight
+            continue
+        duplicates += 1
+        current = records[flight_id]
+        merge_flight(board, records, record)
+        if records[flight_id] is not current:
+            kept[flight_id] = flight
+
+    return list(kept.values()), invalid, duplicates, renamed
+
+
+def compact_date(board, date, data_dir=".", dry_run=False):
+    """Compacts the shard of one date in place. Runs in a worker process.
+
+    Returns the number of flights before and after, plus the counts of compact_shard.
+    """
+    flights = load_shard(board, date, data_dir)
+    compacted, invalid, duplicates, renamed = compact_shard(board, flights)
+    if not dry_run and (len(compacted) != len(flights) or renamed):
+        if compacted:
+            save_shards(board, compacted, data_dir)
+        else:
+            os.remove(shard_path(board, date, data_dir))
+    return len(flights), len(compacted), invalid, duplicates, renamed
+
+
+def compact_board(board, data_dir=".", workers=None, dry_run=False):
+    """Compacts a board's date shards across a process pool and refreshes the rollups of the ones that changed."""
+    dates = shard_dates(board, data_dir)
+    if not dates:
+        print(f"{board}: no shards in {shard_dir(board, data_dir)}")
+        return
+    size_before = sum(os.path.getsize(shard_path(board, date, data_dir)) for date in dates)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(compact_date, [board] * len(dates), dates, [data_dir] * len(dates), [dry_run] * len(dates), chunksize=8))
+
+    before = after = invalid = duplicates = renamed = 0
+    changed = []
+    for date, (shard_before, shard_after, shard_invalid, shard_duplicates, shard_renamed) in zip(dates, results):
+        before += shard_before
+        after += shard_after
+        invalid += shard_invalid
+        duplicates += shard_duplicates
+        renamed += shard_renamed
+        if shard_after != shard_before or shard_renamed:
+            changed.append(date)
+
+    print(f"{board}: {before} -> {after} flights across {len(dates)} dates "
+          f"({before - after} removed: {duplicates} duplicates, {invalid} invalid; {renamed} ids normalised)")
+    if dry_run or not changed:
+        return
+
+    update_rollups(board, load_board(board, data_dir, changed), changed, data_dir)
+    size_after = sum(os.path.getsize(shard_path(board, date, data_dir)) for date in shard_dates(board, data_dir))
+    print(f"{board}: {len(changed)} shards rewritten, {size_before} -> {size_after} bytes ({size_before - size_after} bytes saved)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Normalise flight ids and drop duplicate flights from the date shards.")
+    parser.add_argument("boards", nargs="*", help=f"Boards to compact (default: all of {', '.join(BOARDS)})")
+    parser.add_argument("--data-dir", default=".")
+    parser.add_argument("--workers", type=int, help="Number of worker processes (default: CPU count)")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be removed without writing")
+    args = parser.parse_args()
+    unknown = [board for board in args.boards if board not in BOARDS]
+    if unknown:
+        parser.error(f"unknown board: {', '.join(unknown)}")
+
+    for board in args.boards or list(BOARDS):
+        compact_board(board, args.data_dir, args.workers, args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+from flight_store import BOARDS, load_board, save_shards
+from flight_rollups import update_rollups
+
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Statuses shown on the boards; most are followed by a time or gate, e.g. "LANDED 14:23"
+FLIGHT_STATUSES = (
+    "ON SCHEDULE",
+    "CONFIRMED",
+    "RE-TIMED",
+    "DELAYED",
+    "CANCELLED",
+    "LANDED",
+    "DEPARTED",
+    "BOARDING",
+    "GATE OPEN",
+    "GATE CLOSED",
+    "LAST CALL",
+    "NEW GATE",
+    "DIVERTED",
+    "GO TO INFO COUNTER",
+)
+
+
+class InvalidFlightError(ValueError):
+    """Raised when a flight record does not match the store format."""
+
+
+def create_flight_id(flight_number, scheduled_time):
+    return f"{flight_number}_{scheduled_time}"
+
+
+def parse_flight_time(value):
+    """Parses a 'YYYY-MM-DD HH:MM:SS' store time, raising InvalidFlightError on anything else."""
+    # fromisoformat is several times faster than strptime but also accepts other ISO forms
+    if not isinstance(value, str) or len(value) != 19 or value[10] != ' ':
+        raise InvalidFlightError(f"Invalid flight time: {value!r}")
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise InvalidFlightError(f"Invalid flight time: {value!r}") from None
+
+
+# Statuses outside FLIGHT_STATUSES already reported, so each is only logged once per run
+_reported_statuses = set()
+
+
+def validate_status(status):
+    """Logs statuses the boards have not been seen to show; the site may add new ones at any time."""
+    # An empty status is what the board shows before a flight gets one
+    if status and not status.startswith(FLIGHT_STATUSES):
+        if status not in _reported_statuses:
+            _reported_statuses.add(status)
+            print(f"Unknown flight status: {status!r}")
+
+
+class FlightRecord:
+    """Shared behaviour of the record classes; subclasses are slotted dataclasses."""
+
+    __slots__ = ()
+
+    def __post_init__(self):
+        validate_record(self)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+@dataclass(slots=True)
+class ArrivalFlight(FlightRecord):
+    flight_id: str
+    flight_number: str
+    type: str
+    original_arrival_time: str
+    actual_arrival_time: str
+    airline_name: str
+    origin_country: str
+    terminal: str
+    belt_number: str
+    flight_status: str
+
+    FLIGHT_TYPE = 'Arrival'
+    TIME_FIELDS = ('original_arrival_time', 'actual_arrival_time')
+
+
+@dataclass(slots=True)
+class DepartureFlight(FlightRecord):
+    flight_id: str
+    flight_number: str
+    type: str
+    original_departure_time: str
+    actual_departure_time: str
+    airline_name: str
+    destination: str
+    terminal: str
+    gate_number: str
+    flight_status: str
+
+    FLIGHT_TYPE = 'Departure'
+    TIME_FIELDS = ('original_departure_time', 'actual_departure_time')
+
+
+@dataclass(slots=True)
+class FreighterArrivalFlight(FlightRecord):
+    flight_id: str
+    flight_number: str
+    type: str
+    original_arrival_time: str
+    actual_arrival_time: str
+    airline_name: str
+    origin_country: str
+    flight_status: str
+
+    FLIGHT_TYPE = 'Arrival'
+    TIME_FIELDS = ('original_arrival_time', 'actual_arrival_time')
+
+
+@dataclass(slots=True)
+class FreighterDepartureFlight(FlightRecord):
+    flight_id: str
+    flight_number: str
+    type: str
+    original_departure_time: str
+    actual_departure_time: str
+    airline_name: str
+    destination: str
+    flight_status: str
+
+    FLIGHT_TYPE = 'Freighter Departure'
+    TIME_FIELDS = ('original_departure_time', 'actual_departure_time')
+
+
+# Record class used for each board in flight_store.BOARDS
+RECORD_TYPES = {
+    "arrivals": ArrivalFlight,
+    "departures": DepartureFlight,
+    "freighter_arrivals": FreighterArrivalFlight,
+    "freighter_departures": FreighterDepartureFlight,
+}
+
+
+def validate_record(record):
+    """Checks the type, id and times of a record; unknown statuses are only logged."""
+    if record.type != record.FLIGHT_TYPE:
+        raise InvalidFlightError(f"Expected a {record.FLIGHT_TYPE!r} flight, got {record.type!r}")
+    if not record.flight_id or not record.flight_number:
+        raise InvalidFlightError(f"Flight without id or number: {record.flight_id!r}")
+    for name in record.TIME_FIELDS:
+        parse_flight_time(getattr(record, name))
+    validate_status(record.flight_status)
+
+
+def merge_flight(board, flight_dict, new_flight):
+    """Updates an existing flight or adds a new one in the dictionary, following the rules of the board."""
+    flight_id = new_flight.flight_id
+    if board == "departures":
+        # Passenger departures only change on a gate change or new time, and are only added once they have a gate
+        if flight_id in flight_dict:
+            if "NEW GATE" in new_flight.flight_status or "RE-TIMED" in new_flight.flight_status:
+                flight_dict[flight_id] = new_flight
+        elif new_flight.gate_number != "Unknown":
+            flight_dict[flight_id] = new_flight
+    elif flight_id in flight_dict:
+        if "ON SCHEDULE" not in new_flight.flight_status:
+            flight_dict[flight_id] = new_flight
+    else:
+        flight_dict[flight_id] = new_flight
+
+
+def merge_into_store(board, records, dates, data_dir="."):
+    """Merges scraped records into the board's shards of `dates`, in scrape order, and writes back the ones that changed.
+
+    Only the shards of the scraped dates (and of any record scheduled outside them) are read,
+    so a merge costs the same however long the archive grows. Only the scraped records are
+    validated; archived rows are kept exactly as they are, even ones that would no longer
+    pass validation. The rollups of those dates are refreshed afterwards.
+    """
+    time_field = BOARDS[board]["time_field"]
+    dates = sorted(set(dates) | {getattr(record, time_field)[:10] for record in records})
+    flight_dict = {flight.get('flight_id'): flight for flight in load_board(board, data_dir, dates)}
+    for record in records:
+        merge_flight(board, flight_dict, record)
+
+    merged = [flight if isinstance(flight, dict) else flight.to_dict() for flight in flight_dict.values()]
+    changed = save_shards(board, merged, data_dir)
+    print(f"Flights saved for {len(dates)} dates: {len(merged)} ({len(changed)} shards rewritten)")
+    update_rollups(board, merged, dates, data_dir)
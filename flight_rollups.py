@@ -0,0 +1,117 @@
+import argparse
+import json
+import os
+from datetime import datetime
+
+from flight_store import BOARDS, atomic_write, board_path, load_board, flight_date
+
+
+def rollup_path(board, data_dir="."):
+    """Returns the path of a board's rollup file, named after its single-file JSON store."""
+    root, ext = os.path.splitext(board_path(board, data_dir))
+    return f"{root}_rollups{ext}"
+
+
+def load_rollups(board, data_dir="."):
+    path = rollup_path(board, data_dir)
+    if not os.path.exists(path):
+        return {"board": board, "dates": {}}
+    with open(path, "r") as json_file:
+        return json.load(json_file)
+
+
+def delay_minutes(board, flight):
+    """Returns actual minus original time in minutes, or None if either time is missing."""
+    original_field = BOARDS[board]["time_field"]
+    actual_field = original_field.replace("original_", "actual_")
+    try:
+        original = datetime.strptime(flight[original_field], '%Y-%m-%d %H:%M:%S')
+        actual = datetime.strptime(flight[actual_field], '%Y-%m-%d %H:%M:%S')
+    except (KeyError, ValueError):
+        return None
+    return (actual - original).total_seconds() / 60
+
+
+def compute_day_rollup(board, flights):
+    """Aggregates the flights of a single date on one board."""
+    cancelled = 0
+    delays = []
+    per_airline = {}
+    per_terminal = {}
+
+    for flight in flights:
+        if "CANCELLED" in flight['flight_status']:
+            cancelled += 1
+        else:
+            delay = delay_minutes(board, flight)
+            if delay is not None:
+                delays.append(delay)
+        airline = flight['airline_name']
+        per_airline[airline] = per_airline.get(airline, 0) + 1
+        if 'terminal' in flight:
+            per_terminal[flight['terminal']] = per_terminal.get(flight['terminal'], 0) + 1
+
+    total = len(flights)
+    rollup = {
+        "number_of_flights": total,
+        "cancelled": cancelled,
+        "cancelled_share": round(cancelled / total, 4) if total else 0.0,
+        "average_delay_minutes": round(sum(delays) / len(delays), 2) if delays else None,
+        "delayed_flights": sum(1 for delay in delays if delay > 0),
+        "per_airline": dict(sorted(per_airline.items())),
+    }
+    if per_terminal:
+        rollup["per_terminal"] = dict(sorted(per_terminal.items()))
+    return rollup
+
+
+def update_rollups(board, flights, dates=None, data_dir="."):
+    """Recomputes the rollups of the given dates (all dates if None) and writes the rollup file.
+
+    Flights without a scheduled time are left out.
+    """
+    touched = None if dates is None else set(dates)
+    by_date = {}
+    for flight in flights:
+        try:
+            date = flight_date(board, flight)
+        except KeyError:
+            continue
+        # A flight without a scheduled time belongs to no day
+        if not date:
+            continue
+        if touched is None or date in touched:
+            by_date.setdefault(date, []).append(flight)
+
+    rollups = load_rollups(board, data_dir) if touched is not None else {"board": board, "dates": {}}
+    for date in (touched if touched is not None else by_date):
+        if date in by_date:
+            rollups["dates"][date] = compute_day_rollup(board, by_date[date])
+        else:
+            rollups["dates"].pop(date, None)
+    rollups["dates"] = dict(sorted(rollups["dates"].items()))
+
+    atomic_write(rollup_path(board, data_dir), json.dumps(rollups, indent=4))
+    return rollups
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the daily rollups of the flight boards.")
+    parser.add_argument("boards", nargs="*", help=f"Boards to roll up (default: all of {', '.join(BOARDS)})")
+    parser.add_argument("--dates", nargs="+", help="Only recompute these dates (YYYY-MM-DD)")
+    parser.add_argument("--data-dir", default=".")
+    args = parser.parse_args()
+    unknown = [board for board in args.boards if board not in BOARDS]
+    if unknown:
+        parser.error(f"unknown board: {', '.join(unknown)}")
+
+    for board in args.boards or list(BOARDS):
+        flights = load_board(board, args.data_dir, args.dates)
+        if not flights and args.dates is None:
+            continue
+        rollups = update_rollups(board, flights, args.dates, args.data_dir)
+        print(f"{board}: {len(rollups['dates'])} dates rolled up")
+
+
+if __name__ == "__main__":
+    main()
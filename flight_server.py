@@ -0,0 +1,260 @@
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from email.utils import formatdate
+from urllib.parse import urlsplit, parse_qs
+
+from flight_store import BOARDS, UNDATED, shard_dates, shard_path
+
+DEFAULT_LIMIT = 500
+MAX_LIMIT = 5000
+GZIP_MIN_SIZE = 1024  # Small bodies are not worth compressing
+RESPONSE_CACHE_SIZE = 256
+
+REASONS = {
+    200: "OK",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+}
+
+
+class BoardStore:
+    """Holds one board in memory, indexed by date, and rereads the date shards that change on disk."""
+
+    def __init__(self, board, data_dir="."):
+        self.board = board
+        self.data_dir = data_dir
+        # date -> (stat key, digest of the shard, flights)
+        self.shards = {}
+        self.version = "empty"
+        self.flights = []
+        self.by_date = {}
+
+    def stat_shards(self):
+        """Returns {date: (mtime, size)} of the board's shards on disk."""
+        keys = {}
+        for date in shard_dates(self.board, self.data_dir):
+            try:
+                st = os.stat(shard_path(self.board, date, self.data_dir))
+            except FileNotFoundError:
+                continue
+            keys[date] = (st.st_mtime_ns, st.st_size)
+        return keys
+
+    def changed_on_disk(self):
+        return self.stat_shards() != {date: shard[0] for date, shard in self.shards.items()}
+
+    def reload(self):
+        """Rereads the shards that were rewritten and rebuilds the date index. Runs in a worker thread."""
+        shards = {}
+        for date, stat_key in self.stat_shards().items():
+            current = self.shards.get(date)
+            if current is not None and current[0] == stat_key:
+                shards[date] = current
+                continue
+            with open(shard_path(self.board, date, self.data_dir), "rb") as shard_file:
+                raw = shard_file.read()
+            flights = [json.loads(line) for line in raw.splitlines() if line.strip()]
+            shards[date] = (stat_key, hashlib.sha1(raw).hexdigest(), flights)
+
+        # The shards are named after the dates they hold, so they are the date index
+        by_date = {date: shard[2] for date, shard in shards.items() if date != UNDATED}
+        flights = [flight for date in sorted(shards) for flight in shards[date][2]]
+        digests = "".join(f"{date}={shard[1]};" for date, shard in sorted(shards.items()))
+        # Swap everything in one go so requests never see a half-built index
+        self.shards, self.flights, self.by_date = shards, flights, by_date
+        self.version = hashlib.sha1(digests.encode()).hexdigest()[:16] if shards else "empty"
+
+
+class FlightServer:
+    """Read-only HTTP view over the flight stores with ETag and gzip support."""
+
+    def __init__(self, data_dir=".", poll_interval=5.0):
+        self.poll_interval = poll_interval
+        self.stores = {board: BoardStore(board, data_dir) for board in BOARDS}
+        self.cache = OrderedDict()
+
+    async def refresh(self):
+        loop = asyncio.get_running_loop()
+        reloaded = set()
+        for store in self.stores.values():
+            if store.changed_on_disk():
+                await loop.run_in_executor(None, store.reload)
+                print(f"Loaded {len(store.flights)} flights for {store.board} (version {store.version})")
+                reloaded.add(store.board)
+        if reloaded:
+            # Only the renders that read a rewritten board are stale
+            for key in [key for key, cached in self.cache.items() if reloaded & cached[3]]:
+                del self.cache[key]
+
+    async def watch(self):
+        """Polls the shards and reloads the boards whose shards were rewritten by a scrape."""
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.refresh()
+            except (OSError, ValueError) as e:
+                # A shard caught mid-write is retried on the next poll
+                print(f"Error reloading flight stores: {e}")
+
+    def summary(self):
+        boards = {
+            board: {
+                "number_of_flights": len(store.flights),
+                "version": store.version,
+                "dates": sorted(store.by_date),
+            }
+            for board, store in self.stores.items()
+        }
+        return {"boards": boards}
+
+    def selected_boards(self, path, query):
+        """Returns the boards a request reads; the summary covers all of them."""
+        if path == "/boards":
+            return list(BOARDS)
+        boards = query.get("board", list(BOARDS))
+        unknown = [board for board in boards if board not in self.stores]
+        if unknown:
+            raise ValueError(f"Unknown board: {', '.join(unknown)}")
+        return boards
+
+    def select(self, query):
+        """Returns the filtered, paginated view described by the query string."""
+        boards = self.selected_boards("/flights", query)
+        dates = query.get("date")
+        airlines = {name.lower() for name in query.get("airline", [])}
+        offset = int(query.get("offset", ["0"])[0])
+        limit = min(int(query.get("limit", [str(DEFAULT_LIMIT)])[0]), MAX_LIMIT)
+        if offset < 0 or limit < 0:
+            raise ValueError("offset and limit must not be negative")
+
+        matched = []
+        for board in boards:
+            store = self.stores[board]
+            if dates:
+                candidates = [flight for date in dates for flight in store.by_date.get(date, [])]
+            else:
+                candidates = store.flights
+            if airlines:
+                candidates = [flight for flight in candidates if str(flight.get("airline_name", "")).lower() in airlines]
+            matched.extend(candidates)
+
+        return {
+            "flights": matched[offset:offset + limit],
+            "number_of_flights": len(matched),
+            "offset": offset,
+            "limit": limit,
+        }
+
+    def render(self, path, query):
+        """Builds (etag, body, gzipped body) for a request, reusing cached renders."""
+        key = (path, tuple(sorted((k, tuple(v)) for k, v in query.items())))
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.cache.move_to_end(key)
+            return cached[:3]
+
+        if path == "/boards":
+            payload = self.summary()
+        else:
+            payload = self.select(query)
+        # The ETag only changes when a board the view reads is rewritten
+        boards = self.selected_boards(path, query)
+        versions = "".join(f"{board}={self.stores[board].version};" for board in sorted(set(boards)))
+        etag = '"' + hashlib.sha1(f"{versions}{key}".encode()).hexdigest()[:20] + '"'
+        body = json.dumps(payload, separators=(",", ":")).encode()
+        gzipped = gzip.compress(body, compresslevel=5) if len(body) >= GZIP_MIN_SIZE else None
+
+        self.cache[key] = (etag, body, gzipped, frozenset(boards))
+        if len(self.cache) > RESPONSE_CACHE_SIZE:
+            self.cache.popitem(last=False)
+        return etag, body, gzipped
+
+    def respond(self, method, target, headers):
+        """Returns (status, extra headers, body) for a parsed request."""
+        if method not in ("GET", "HEAD"):
+            return 405, {"Allow": "GET, HEAD"}, b""
+        url = urlsplit(target)
+        if url.path not in ("/boards", "/flights"):
+            return 404, {}, b""
+        query = {k: ",".join(v).split(",") for k, v in parse_qs(url.query).items()}
+        try:
+            etag, body, gzipped = self.render(url.path, query)
+        except ValueError as e:
+            return 400, {"Content-Type": "text/plain"}, str(e).encode()
+
+        extra = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if etag in [tag.strip() for tag in headers.get("if-none-match", "").split(",")]:
+            return 304, extra, b""
+        extra["Content-Type"] = "application/json"
+        if gzipped is not None and "gzip" in headers.get("accept-encoding", ""):
+            extra["Content-Encoding"] = "gzip"
+            body = gzipped
+        return 200, extra, body
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                status, extra, body = self.respond(method, target, headers)
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                head = [f"HTTP/1.1 {status} {REASONS[status]}", f"Date: {formatdate(usegmt=True)}"]
+                head += [f"{name}: {value}" for name, value in extra.items()]
+                head.append(f"Content-Length: {len(body)}")
+                head.append("Connection: keep-alive" if keep_alive else "Connection: close")
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+                if method != "HEAD":
+                    writer.write(body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host, port):
+        await self.refresh()
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"Serving flight boards on http://{host}:{port}")
+        async with server:
+            await asyncio.gather(server.serve_forever(), self.watch())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the flight boards over HTTP from memory.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--data-dir", default=".", help="Directory holding the data/<board>/<date>.jsonl shards")
+    parser.add_argument("--poll-interval", type=float, default=5.0, help="Seconds between checks for updated shards")
+    args = parser.parse_args()
+
+    server = FlightServer(args.data_dir, args.poll_interval)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
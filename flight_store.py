@@ -0,0 +1,197 @@
+import json
+import os
+import shutil
+import tempfile
+
+# Flight boards scraped by the workflows. "path" is the single-file JSON store the boards were
+# kept in before they were sharded by date; publish_flights converts between the two.
+BOARDS = {
+    "arrivals": {
+        "url": "https://www.changiairport.com/en/flights/arrivals.html",
+        "path": "arrival_flights.json",
+        "time_field": "original_arrival_time",
+    },
+    "departures": {
+        "url": "https://www.changiairport.com/en/flights/departures.html",
+        "path": "departure_flights.json",
+        "time_field": "original_departure_time",
+    },
+    "freighter_arrivals": {
+        "url": "https://www.changiairport.com/en/flights/arrival-freighter.html",
+        "path": "freighter_arrival_flights.json",
+        "time_field": "original_arrival_time",
+    },
+    "freighter_departures": {
+        "url": "https://www.changiairport.com/en/flights/departure-freighter.html",
+        "path": "freighter_departure_flights.json",
+        "time_field": "original_departure_time",
+    },
+}
+
+# Previous versions of a store kept as <store>.bak.N when it is rewritten
+DEFAULT_BACKUPS = int(os.environ.get("FLIGHT_STORE_BACKUPS", "0"))
+# Each board is stored as one JSON-lines shard per scheduled date, in <data_dir>/data/<board>/<date>.jsonl
+SHARD_ROOT = "data"
+# Shard for flights without a scheduled time
+UNDATED = "undated"
+
+
+def board_path(board, data_dir="."):
+    """Returns the path of the single-file JSON store for a board."""
+    return os.path.join(data_dir, BOARDS[board]["path"])
+
+
+def load_flights(path):
+    """Loads the list of flights from a JSON store, or an empty list if the file does not exist."""
+    if not os.path.exists(path):
+        return []
+    with open(path, "r") as json_file:
+        return json.load(json_file)["flights"]
+
+
+def rotate_backups(path, backups):
+    """Shifts path.bak.1..N up by one and links the current store as path.bak.1."""
+    for n in range(backups - 1, 0, -1):
+        older = f"{path}.bak.{n}"
+        if os.path.exists(older):
+            os.replace(older, f"{path}.bak.{n + 1}")
+    newest = f"{path}.bak.1"
+    if os.path.exists(newest):
+        os.unlink(newest)
+    try:
+        # A hard link keeps the old contents alive after the rename without copying them
+        os.link(path, newest)
+    except OSError:
+        shutil.copy2(path, newest)
+
+
+def atomic_write(path, text, backups=None):
+    """Replaces a file with new contents so readers see either the old or the new file, never a partial one.
+
+    The data is written to a temp file in the same directory, fsynced and renamed over the
+    target. With backups > 0 the previous versions are kept as path.bak.1..N.
+    """
+    if backups is None:
+        backups = DEFAULT_BACKUPS
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=os.path.splitext(path)[1], dir=directory)
+    try:
+        # mkstemp creates the file private; give it the permissions a plain open() would
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_path, 0o666 & ~umask)
+        with os.fdopen(fd, "w") as tmp_file:
+            tmp_file.write(text)
+            tmp_file.flush()
+            os.fsync(tmp_file.fileno())
+        if backups > 0 and os.path.exists(path):
+            rotate_backups(path, backups)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+    # Persist the rename itself; not every platform lets a directory be opened
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+def save_flights(path, flights, backups=None):
+    """Atomically writes a list of flight dicts to a JSON store."""
+    atomic_write(path, json.dumps({"flights": flights, "number_of_flights": len(flights)}, indent=4), backups)
+
+
+def flight_date(board, flight):
+    """Returns the scheduled date (YYYY-MM-DD) of a flight on the given board."""
+    return flight[BOARDS[board]["time_field"]][:10]
+
+
+def shard_dir(board, data_dir="."):
+    return os.path.join(data_dir, SHARD_ROOT, board)
+
+
+def shard_path(board, date, data_dir="."):
+    """Returns the path of the shard holding a board's flights of one date (YYYY-MM-DD)."""
+    return os.path.join(shard_dir(board, data_dir), f"{date}.jsonl")
+
+
+def shard_dates(board, data_dir="."):
+    """Returns the dates a board has shards for, in order."""
+    directory = shard_dir(board, data_dir)
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name[:-len(".jsonl")] for name in os.listdir(directory) if name.endswith(".jsonl"))
+
+
+def shard_key(board, flight):
+    """Returns the shard a flight is stored in: its scheduled date, or UNDATED without one."""
+    try:
+        return flight_date(board, flight) or UNDATED
+    except KeyError:
+        return UNDATED
+
+
+def partition_flights(board, flights):
+    """Groups flights by the shard they are stored in, keeping their order."""
+    shards = {}
+    for flight in flights:
+        shards.setdefault(shard_key(board, flight), []).append(flight)
+    return shards
+
+
+def encode_shard(board, flights):
+    """Encodes flights one per line, ordered by scheduled time and flight id.
+
+    The order depends only on the flights, not on the order they were scraped in, so an
+    unchanged day encodes to the same bytes and a changed flight touches a single line.
+    """
+    time_field = BOARDS[board]["time_field"]
+    ordered = sorted(flights, key=lambda flight: (flight.get(time_field, ""), flight.get("flight_id", "")))
+    return "".join(json.dumps(flight) + "\n" for flight in ordered)
+
+
+def read_shard(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as shard_file:
+        return shard_file.read()
+
+
+def load_shard(board, date, data_dir="."):
+    """Loads the flights of one shard, or an empty list if there is none."""
+    text = read_shard(shard_path(board, date, data_dir))
+    if text is None:
+        return []
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def load_board(board, data_dir=".", dates=None):
+    """Loads a board's flights from its shards, optionally only those of the given dates."""
+    if dates is None:
+        dates = shard_dates(board, data_dir)
+    return [flight for date in dates for flight in load_shard(board, date, data_dir)]
+
+
+def save_shards(board, flights, data_dir="."):
+    """Writes flights into their date shards, each shard holding exactly the flights given for it.
+
+    Only the shards whose contents changed are rewritten; shards of other dates are left alone.
+    Returns the paths written.
+    """
+    changed = []
+    for date, shard_flights in sorted(partition_flights(board, flights).items()):
+        path = shard_path(board, date, data_dir)
+        text = encode_shard(board, shard_flights)
+        if read_shard(path) != text:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # The shards are tracked in git, which already keeps their history
+            atomic_write(path, text, backups=0)
+            changed.append(path)
+    return changed
@@ -0,0 +1,61 @@
+import argparse
+import os
+
+from flight_store import (BOARDS, board_path, load_board, load_flights, partition_flights, save_flights, save_shards,
+                          shard_dates, shard_dir, shard_path)
+
+
+def publish_board(board, data_dir="."):
+    """Converts a board's single-file JSON store into date shards, rewriting only the shards that changed.
+
+    Shards of dates that are no longer in the store are removed. Returns the paths written or removed.
+    A board without a store is skipped rather than unpublished.
+    """
+    path = board_path(board, data_dir)
+    if not os.path.exists(path):
+        print(f"{board}: no store at {path}")
+        return []
+
+    flights = load_flights(path)
+    changed = save_shards(board, flights, data_dir)
+    dates = partition_flights(board, flights)
+    for date in shard_dates(board, data_dir):
+        if date not in dates:
+            os.remove(shard_path(board, date, data_dir))
+            changed.append(shard_path(board, date, data_dir))
+
+    print(f"{board}: {len(dates)} shards, {len(changed)} changed")
+    return changed
+
+
+def restore_board(board, data_dir="."):
+    """Rebuilds a board's single-file JSON store from its shards, if there are any."""
+    dates = shard_dates(board, data_dir)
+    if not dates:
+        print(f"{board}: no shards in {shard_dir(board, data_dir)}; keeping {board_path(board, data_dir)}")
+        return
+
+    flights = load_board(board, data_dir, dates)
+    save_flights(board_path(board, data_dir), flights)
+    print(f"{board}: restored {len(flights)} flights from {len(dates)} shards")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert single-file JSON flight stores into the date shards the tools read, or back.")
+    parser.add_argument("boards", nargs="*", help=f"Boards to convert (default: all of {', '.join(BOARDS)})")
+    parser.add_argument("--data-dir", default=".")
+    parser.add_argument("--restore", action="store_true", help="Rebuild the JSON stores from the shards instead")
+    args = parser.parse_args()
+    unknown = [board for board in args.boards if board not in BOARDS]
+    if unknown:
+        parser.error(f"unknown board: {', '.join(unknown)}")
+
+    for board in args.boards or list(BOARDS):
+        if args.restore:
+            restore_board(board, args.data_dir)
+        else:
+            publish_board(board, args.data_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import asyncio
+import os
+import random
+import time
+
+# Retries of a failed stage after its first attempt
+RETRIES = int(os.environ.get("SCRAPE_RETRIES", "3"))
+# Backoff before retry n is about BACKOFF_SECONDS * 2**n, jittered and capped at BACKOFF_MAX_SECONDS
+BACKOFF_SECONDS = float(os.environ.get("SCRAPE_BACKOFF_SECONDS", "2"))
+BACKOFF_MAX_SECONDS = float(os.environ.get("SCRAPE_BACKOFF_MAX_SECONDS", "30"))
+# Consecutive failed attempts, across all stages, after which the site is taken to be down
+BREAKER_THRESHOLD = int(os.environ.get("SCRAPE_BREAKER_THRESHOLD", "8"))
+
+# Exit status of a run stopped by the circuit breaker (EX_TEMPFAIL), so callers can tell
+# "site down, do not retry now" apart from a crash worth retrying at once
+CIRCUIT_OPEN_EXIT_CODE = 75
+
+# Seconds each attempt of a stage may take; override with SCRAPE_TIMEOUT_<STAGE>, e.g. SCRAPE_TIMEOUT_LOAD_MORE
+STAGE_TIMEOUTS = {
+    "navigate": 30,
+    "choose_date": 20,
+    "load_more": 15,
+    "rows": 10,
+}
+
+
+class StageError(Exception):
+    """A scrape stage that still failed after all its retries."""
+
+    def __init__(self, stage, error):
+        super().__init__(f"{stage} failed: {error}")
+        self.stage = stage
+        self.error = error
+
+
+class CircuitOpenError(StageError):
+    """Too many consecutive failures; the run stops instead of retrying against a site that is down."""
+
+
+def stage_timeout(stage):
+    return float(os.environ.get(f"SCRAPE_TIMEOUT_{stage.upper()}", STAGE_TIMEOUTS[stage]))
+
+
+def backoff_delay(attempt):
+    """Returns the jittered delay before retry `attempt` (0 for the first retry)."""
+    delay = min(BACKOFF_MAX_SECONDS, BACKOFF_SECONDS * 2 ** attempt)
+    return delay * random.uniform(0.5, 1)
+
+
+class CircuitBreaker:
+    """Counts consecutive failed attempts and opens once they reach the threshold.
+
+    Every successful attempt closes it again, so only an unbroken run of failures, as when
+    the site is down, stops the scrape. An open breaker stays open for the rest of the run.
+    """
+
+    def __init__(self, threshold=None):
+        self.threshold = BREAKER_THRESHOLD if threshold is None else threshold
+        self.failures = 0
+
+    def check(self):
+        if self.failures >= self.threshold:
+            raise CircuitOpenError("circuit breaker", f"{self.failures} consecutive failures")
+
+    def record_failure(self):
+        self.failures += 1
+
+    def record_success(self):
+        self.failures = 0
+
+
+def retry(stage, operation, retry_on, breaker=None, retries=None, recover=None):
+    """Runs `operation()`, retrying it with backoff when it raises one of `retry_on`.
+
+    `recover()`, if given, is called before each retry to put the page back into a known
+    state. Raises StageError once the retries are used up, and CircuitOpenError as soon as
+    the breaker opens.
+    """
+    retries = RETRIES if retries is None else retries
+    for attempt in range(retries + 1):
+        if breaker is not None:
+            breaker.check()
+        try:
+            if attempt and recover is not None:
+                recover()
+            result = operation()
+        except CircuitOpenError:
+            raise
+        except retry_on as e:
+            if breaker is not None:
+                breaker.record_failure()
+            if attempt == retries:
+                raise StageError(stage, e) from e
+            delay = backoff_delay(attempt)
+            print(f"{stage} failed ({e}); retry {attempt + 1} of {retries} in {delay:.1f}s")
+            time.sleep(delay)
+        else:
+            if breaker is not None:
+                breaker.record_success()
+            return result
+
+
+async def retry_async(stage, operation, retry_on, breaker=None, retries=None, recover=None):
+    """Coroutine version of retry() for the asyncio engine; `operation` and `recover` are coroutine functions."""
+    retries = RETRIES if retries is None else retries
+    for attempt in range(retries + 1):
+        if breaker is not None:
+            breaker.check()
+        try:
+            if attempt and recover is not None:
+                await recover()
+            result = await operation()
+        except CircuitOpenError:
+            raise
+        except retry_on as e:
+            if breaker is not None:
+                breaker.record_failure()
+            if attempt == retries:
+                raise StageError(stage, e) from e
+            delay = backoff_delay(attempt)
+            print(f"{stage} failed ({e}); retry {attempt + 1} of {retries} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+        else:
+            if breaker is not None:
+                breaker.record_success()
+            return result
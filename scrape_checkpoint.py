@@ -0,0 +1,112 @@
+import json
+import os
+import time
+from datetime import datetime
+
+from flight_store import atomic_write, board_path
+from flight_records import RECORD_TYPES, TIME_FORMAT
+
+# A checkpoint older than this is stale: the boards have changed too much to resume from it
+CHECKPOINT_MAX_AGE_HOURS = float(os.environ.get("CHECKPOINT_MAX_AGE_HOURS", "6"))
+# Identifies a run across its retries; only a retry of the same run resumes, a later run scrapes afresh.
+# Without one, every run starts from scratch.
+RUN_ID = os.environ.get("SCRAPE_RUN_ID") or os.environ.get("GITHUB_RUN_ID")
+
+
+def checkpoint_path(board, data_dir="."):
+    """Returns the path of the checkpoint file stored next to a board's JSON store."""
+    root, ext = os.path.splitext(board_path(board, data_dir))
+    return f"{root}_checkpoint{ext}"
+
+
+class ScrapeCheckpoint:
+    """Progress of one board's scrape, saved after every page so a failed run can resume.
+
+    For each date it holds the flights read so far and the cursor into the board after a pick
+    of that date: the index of the next row to read and the scheduled time of the last flight
+    read. A pick can run on into later dates, whose flights are kept under those dates.
+    """
+
+    def __init__(self, board, dates, data_dir=".", run_id=None):
+        self.board = board
+        self.run_id = RUN_ID if run_id is None else run_id
+        self.path = checkpoint_path(board, data_dir)
+        self.created = time.time()
+        self.dates = {
+            date: {"done": False, "index": 0, "last_time": None, "flights": []}
+            for date in dates
+        }
+
+    @classmethod
+    def load(cls, board, dates, data_dir=".", run_id=None):
+        """Returns the checkpoint an earlier attempt of this run left for the same dates, or a new one."""
+        checkpoint = cls(board, dates, data_dir, run_id)
+        if not checkpoint.run_id or not os.path.exists(checkpoint.path):
+            return checkpoint
+        try:
+            with open(checkpoint.path, "r") as json_file:
+                saved = json.load(json_file)
+        except ValueError:
+            print(f"Ignoring unreadable checkpoint {checkpoint.path}")
+            return checkpoint
+
+        age_hours = (time.time() - saved.get("created", 0)) / 3600
+        if saved.get("run_id") != checkpoint.run_id or saved.get("board") != board or list(saved.get("dates", {})) != list(dates):
+            print(f"Ignoring checkpoint {checkpoint.path} of a different run")
+        elif age_hours > CHECKPOINT_MAX_AGE_HOURS:
+            print(f"Ignoring checkpoint {checkpoint.path} from {age_hours:.1f} hours ago")
+        else:
+            checkpoint.created = saved["created"]
+            checkpoint.dates = saved["dates"]
+            done = sum(state["done"] for state in checkpoint.dates.values())
+            print(f"Resuming {board} from checkpoint: {done} of {len(dates)} dates done, {len(checkpoint.flights())} flights read")
+        return checkpoint
+
+    def cursor(self, date):
+        """Returns (done, index of the next row, scheduled datetime of the last flight or None) for a date."""
+        state = self.dates[date]
+        last_time = datetime.strptime(state["last_time"], TIME_FORMAT) if state["last_time"] else None
+        return state["done"], state["index"], last_time
+
+    def save_page(self, date, records, index, last_time, done=False):
+        """Records the flights of one page and the cursor after it, and writes the checkpoint."""
+        self.save_pages(date, {date: records}, index, last_time, [date] if done else [])
+
+    def save_pages(self, date, pages, index, last_time, done=()):
+        """Records a page read from a pick of `date` that may run on into later dates, and writes the checkpoint.
+
+        `pages` maps dates to the flights read for them. The cursor is kept on the picked date,
+        and the dates in `done` are marked complete.
+        """
+        for page_date, records in pages.items():
+            self.dates[page_date]["flights"].extend(record.to_dict() for record in records)
+        state = self.dates[date]
+        state["index"] = index
+        state["last_time"] = last_time.strftime(TIME_FORMAT) if last_time else None
+        for done_date in done:
+            self.dates[done_date]["done"] = True
+        self.save()
+
+    def discard(self, date):
+        """Forgets the flights read for a date that is about to be read again from the top."""
+        self.dates[date]["flights"] = []
+
+    def save(self):
+        checkpoint = {"board": self.board, "run_id": self.run_id, "created": self.created, "dates": self.dates}
+        atomic_write(self.path, json.dumps(checkpoint), backups=0)
+
+    def flights(self, date=None):
+        """Returns the flights read so far as dicts, in date and board order, optionally of one date only."""
+        states = self.dates.values() if date is None else [self.dates[date]]
+        return [flight for state in states for flight in state["flights"]]
+
+    def records(self, date=None):
+        record_type = RECORD_TYPES[self.board]
+        return [record_type(**flight) for flight in self.flights(date)]
+
+    def complete(self):
+        return all(state["done"] for state in self.dates.values())
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
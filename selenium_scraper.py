@@ -0,0 +1,343 @@
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from datetime import datetime, timedelta
+import json
+import sys
+
+from flight_store import BOARDS
+from flight_records import InvalidFlightError, merge_into_store
+from scrape_checkpoint import ScrapeCheckpoint
+from chrome_profile import discard_profile, ensure_profile, profile_args, profile_dir
+from retry_policy import CIRCUIT_OPEN_EXIT_CODE, CircuitBreaker, CircuitOpenError, StageError, retry, stage_timeout
+from browser_memory import dom_nodes, over_budget, process_tree_rss, restart_due
+from board_page import DEFAULT_DAYS, EXTRACT_ROWS_JS, FLIGHT_ROWS, PLACE_SELECTORS, PRUNE_ROWS_JS, TIME_THRESHOLD, board_kind, build_flight
+
+# Seconds to wait for the "Load more" button on each board
+LOAD_MORE_TIMEOUTS = {"departures": 20}
+
+# The browser is only started by start_driver(), so importing this module is cheap
+driver = None
+wait = None
+# Shared by every stage of a run, so a site that keeps failing stops the run early
+breaker = CircuitBreaker()
+
+
+def chrome_options(profile=None):
+    """Configure Chrome options for headless mode, optionally on a persistent profile."""
+    options = Options()
+    options.add_argument("--headless")  # Run in headless mode
+    options.add_argument("--disable-gpu")  # Disable GPU usage
+    options.add_argument("--window-size=1920,1080")  # Set window size to avoid issues with some elements not being visible
+    options.add_argument("--no-sandbox")  # Bypass OS security model
+    options.add_argument("--disable-dev-shm-usage")  # Overcome limited resource problems in Docker
+    options.add_argument("--disable-extensions")  # Disable extensions
+    if profile:
+        # Reuse the profile and HTTP cache of earlier runs so the site's bundles load from disk
+        for argument in profile_args(profile):
+            options.add_argument(argument)
+    return options
+
+
+def start_driver(board):
+    """Starts Chrome and opens the board's flight page."""
+    global driver, wait
+    profile = profile_dir(board)
+    if profile:
+        ensure_profile(profile)
+    try:
+        driver = webdriver.Chrome(options=chrome_options(profile))
+    except WebDriverException as e:
+        if not profile:
+            raise
+        print(f"Chrome failed to start with profile {profile}: {e}")
+        discard_profile(profile)
+        driver = webdriver.Chrome(options=chrome_options(profile))
+    wait = WebDriverWait(driver, LOAD_MORE_TIMEOUTS.get(board, stage_timeout("load_more")))
+    driver.set_page_load_timeout(stage_timeout("navigate"))
+    driver.execute_cdp_cmd("Performance.enable", {})
+    open_board(board)
+
+
+def open_board(board):
+    """Loads the board's flight page, retrying failed loads."""
+    retry("navigate", lambda: driver.get(BOARDS[board]["url"]), WebDriverException, breaker)
+
+
+def restart_driver(board):
+    quit_driver()
+    start_driver(board)
+
+
+def quit_driver():
+    global driver, wait
+    if driver is not None:
+        driver.quit()
+    driver = wait = None
+
+
+def scroll_and_click(element):
+    """Scrolls to an element and clicks it using JavaScript."""
+    driver.execute_script("arguments[0].scrollIntoView(true);", element)
+    WebDriverWait(driver, 10).until(EC.element_to_be_clickable(element))
+    driver.execute_script("arguments[0].click();", element)
+
+
+def choose_date(date):
+    """Selects a date from the date picker and waits for the flights list to load.
+
+    Raises WebDriverException if the picker or the flights list does not show up in time.
+    """
+    timeout = stage_timeout("choose_date")
+    try:
+        # Click the calendar input to open the date picker
+        calendar_input = driver.find_element(By.CSS_SELECTOR, 'div.react-datepicker__input-container input[type="button"]')
+        if calendar_input:
+            print("Calendar button found")
+        scroll_and_click(calendar_input)
+
+        # Wait for the date picker to be visible
+        WebDriverWait(driver, timeout).until(
+            EC.visibility_of_element_located((By.CLASS_NAME, 'react-datepicker__month'))
+        )
+        print("Date picker is visible")
+
+        # Page the picker forward when the date is in a later month than the one shown
+        month_label = date.strftime('%B %Y')
+        for _ in range(3):
+            current_month = driver.find_elements(By.CLASS_NAME, 'react-datepicker__current-month')
+            if not current_month or current_month[0].text.strip() == month_label:
+                break
+            scroll_and_click(driver.find_element(By.CLASS_NAME, 'react-datepicker__navigation--next'))
+
+        # Generate the correct class name with two digits for the day
+        day_str = f"{date.day:03d}"
+        target_day_class = f"react-datepicker__day--{day_str}"
+
+        # Locate and click the target day element
+        date_element = driver.find_element(By.CSS_SELECTOR, f".{target_day_class}:not(.react-datepicker__day--outside-month)")
+        scroll_and_click(date_element)
+        print("Date clicked")
+        driver.save_screenshot("screenshot1.png")  # Save a screenshot for debugging
+
+        # Wait for the flights list to update
+        WebDriverWait(driver, timeout).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, 'div.data.flightlist'))
+        )
+        print("Flights list should be updated now")
+        driver.save_screenshot("screenshot2.png")  # Save a screenshot to confirm the flights list
+
+    except WebDriverException as e:
+        print(f"Date picker not visible or error occurred: {e}")
+        driver.save_screenshot("Exception in date picker.png")  # Save a screenshot for debugging
+        raise
+
+
+def select_date(board, date):
+    """Chooses a date, reloading the board page before each retry."""
+    retry("choose_date", lambda: choose_date(date), WebDriverException, breaker, recover=lambda: open_board(board))
+
+
+def page_row_count():
+    return driver.execute_script(f"return document.querySelectorAll({json.dumps(FLIGHT_ROWS)}).length;")
+
+
+def read_rows(board, start):
+    """Returns (number of rows on the page, raw rows from index `start` on) in one script call.
+
+    Reading the cells in the page avoids holding a WebElement handle for every row.
+    """
+    result = driver.execute_script(f"return {EXTRACT_ROWS_JS}(arguments[0], arguments[1]);", start, PLACE_SELECTORS[board_kind(board)])
+    return result["count"], result["rows"]
+
+
+def prune_rows(end):
+    """Empties the rows before index `end`, which have already been read."""
+    return driver.execute_script(f"return {PRUNE_ROWS_JS}(arguments[0]);", end)
+
+
+def memory_usage():
+    """Returns (RSS of the Chrome processes in MB or None, DOM nodes of the page)."""
+    metrics = driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]
+    return process_tree_rss(driver.service.process.pid), dom_nodes(metrics)
+
+
+def load_more_rows(previous_count):
+    """Clicks "Load more" and waits for new rows. Returns False when there is nothing more to load.
+
+    Raises WebDriverException when the button is there but no new rows arrive in time.
+    """
+    try:
+        load_more_button = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, 'a.gray-bg.next-flights')))
+    except TimeoutException:
+        print("No more flights to load")
+        return False
+    driver.execute_script("arguments[0].scrollIntoView(true);", load_more_button)
+    WebDriverWait(driver, stage_timeout("rows")).until(EC.visibility_of(load_more_button))
+
+    driver.execute_script("arguments[0].click();", load_more_button)
+
+    WebDriverWait(driver, stage_timeout("rows")).until(lambda driver: page_row_count() > previous_count)
+    return True
+
+
+def load_more(previous_count):
+    return retry("load_more", lambda: load_more_rows(previous_count), WebDriverException, breaker)
+
+
+def page_to_row(board, date, index):
+    """Picks a date and pages it up to row `index`, pruning on the way."""
+    select_date(board, date)
+    count = page_row_count()
+    while count < index:
+        prune_rows(count)
+        if not load_more(count):
+            break
+        count = page_row_count()
+    if index:
+        print(f"Resumed {date.strftime('%Y-%m-%d')} at row {index} of {count}")
+
+
+def resume_date(board, date, index):
+    """Restarts Chrome and pages a date back up to row `index`."""
+    restart_driver(board)
+    page_to_row(board, date, index)
+
+
+###################### PROCESS FLIGHTS WITHIN DAY
+def process_flights(board, day, rows, last_time, pages, last_day):
+    """Builds a page of rows into `pages` ({date: flights}), following the list on past midnight.
+
+    Returns the day of the last row read, its scheduled time, and whether the list has run
+    on past `last_day`.
+    """
+    for row in rows:
+        try:
+            built = build_flight(board, day, row)
+            if built is None:
+                continue
+            new_flight, unmodified_datetime = built
+
+            # An earlier time past the threshold means the list has moved on to the next day
+            if last_time and unmodified_datetime < last_time - TIME_THRESHOLD:
+                day += timedelta(days=1)
+                if day > last_day:
+                    return day, last_time, True
+                new_flight, unmodified_datetime = build_flight(board, day, row)
+            last_time = unmodified_datetime
+            pages.setdefault(day.strftime('%Y-%m-%d'), []).append(new_flight)
+
+        except InvalidFlightError as e:
+            print(f"Skipping invalid flight: {e}")
+        except Exception as e:
+            print("Error processing flight details:", e)
+
+    return day, last_time, False
+
+
+#############################################################
+def scrape_flights_for_date(board, date, checkpoint, last_date):
+    """Scrapes a pick of `date` into the checkpoint, following the list on into later dates up to `last_date`.
+
+    A date the list has moved past is complete, so it is not picked again. Raises StageError
+    when a stage keeps failing.
+    """
+    date_key = date.strftime('%Y-%m-%d')
+    # Carry on from the cursor a failed attempt left in the checkpoint; a new pick starts at row 0
+    done, index, last_time = checkpoint.cursor(date_key)
+    if done:
+        print(f"{date_key} already scraped")
+        return
+    if not index:
+        # An earlier pick may have stopped part way through this date; it is read again from the top
+        checkpoint.discard(date_key)
+    day = last_time.date() if last_time else date.date()
+
+    # select date for flight schedule
+    page_to_row(board, date, index)
+    restarted_at = None
+
+    while True:
+        count, rows = retry("rows", lambda: read_rows(board, index), WebDriverException, breaker)
+        pages = {}
+        first_day = day
+        day, last_time, past_end = process_flights(board, day, rows, last_time, pages, last_date.date())
+        index = count
+        # Every date the list has moved past is complete
+        finished = [(first_day + timedelta(days=n)).strftime('%Y-%m-%d') for n in range((day - first_day).days)]
+
+        # check for error in variables
+        print(last_time, day, index)
+        checkpoint.save_pages(date_key, pages, index, last_time, finished)
+        if past_end:
+            break
+
+        # Keep the page small, and start over on a fresh browser once it has grown too big anyway
+        prune_rows(index)
+        rss_mb, nodes = memory_usage()
+        if restart_due(over_budget(rss_mb, nodes), index, restarted_at):
+            print(f"Restarting Chrome at {rss_mb or 0:.0f} MB and {nodes} DOM nodes")
+            resume_date(board, date, index)
+            restarted_at = index
+
+        if not load_more(index):
+            # The last date the list reached may be cut short; it keeps its own pick
+            checkpoint.save_pages(date_key, {}, index, last_time, [date_key])
+            break
+
+
+def main(board, days=None):
+    """Scrapes the next `days` days of a board and merges them into its store.
+
+    The list of a picked date runs on past midnight, so a date it already covered is not
+    picked again. Progress is checkpointed after every page. A date whose stages keep failing is retried
+    once on a fresh browser from its checkpoint, then left for a retry of the same run
+    (see scrape_checkpoint.RUN_ID). When the circuit breaker opens, what was read is merged
+    and the run exits with an error.
+    """
+    global breaker
+    days = DEFAULT_DAYS if days is None else days
+    start_date = datetime.today()
+    dates = [start_date + timedelta(days=day) for day in range(days)]
+    if not dates:
+        print("Nothing to scrape.")
+        return
+    date_keys = [date.strftime('%Y-%m-%d') for date in dates]
+
+    checkpoint = ScrapeCheckpoint.load(board, date_keys)
+    breaker = CircuitBreaker()
+    stopped = None
+    if not checkpoint.complete():
+        try:
+            start_driver(board)
+            for target_date in dates:
+                print(f"Scraping flights for {target_date.strftime('%Y-%m-%d')}")
+                try:
+                    retry("date", lambda: scrape_flights_for_date(board, target_date, checkpoint, dates[-1]), (StageError, WebDriverException), breaker,
+                          retries=1, recover=lambda: restart_driver(board))
+                except CircuitOpenError:
+                    raise
+                except StageError as e:
+                    print(f"Giving up on {target_date.strftime('%Y-%m-%d')}: {e}")
+        except StageError as e:
+            stopped = e
+        finally:
+            quit_driver()
+
+    # Scraped flights in board order; the store is only read once there is something to merge
+    scraped = checkpoint.records()
+    print(f"Total flights scraped: {len(scraped)}")
+    if scraped:
+        merge_into_store(board, scraped, date_keys)
+    if checkpoint.complete():
+        checkpoint.clear()
+    else:
+        print(f"Some dates were cut short; a retry of this run resumes them from {checkpoint.path}")
+    if isinstance(stopped, CircuitOpenError):
+        print(f"Stopped scraping {board}: {stopped}", file=sys.stderr)
+        raise SystemExit(CIRCUIT_OPEN_EXIT_CODE)
+    if stopped is not None:
+        raise SystemExit(f"Stopped scraping {board}: {stopped}")
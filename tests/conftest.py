@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+# The modules live flat at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def freighter_arrival():
+    """Returns a factory for freighter arrival rows as the store holds them."""
+    def make(flight_number, scheduled="2024-08-20 14:45:00", status="LANDED", actual=None, flight_id=None):
+        return {
+            "flight_id": f"{flight_number}_{scheduled}" if flight_id is None else flight_id,
+            "flight_number": flight_number,
+            "type": "Arrival",
+            "original_arrival_time": scheduled,
+            "actual_arrival_time": actual or scheduled,
+            "airline_name": "Federal Express",
+            "origin_country": "Guangzhou",
+            "flight_status": status,
+        }
+    return make
@@ -0,0 +1,96 @@
+import asyncio
+import json
+import os
+from datetime import date, datetime
+
+import pytest
+
+from board_page import EXTRACT_ROWS_JS, PLACE_SELECTORS, PRUNE_ROWS_JS, build_flight
+from flight_records import ArrivalFlight, InvalidFlightError
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+BOARD_HTML = os.path.join(FIXTURES, "arrivals_board.html")
+SCRAPE_DATE = date(2026, 10, 19)
+
+
+def board_rows():
+    """The rows EXTRACT_ROWS_JS reads from arrivals_board.html."""
+    with open(os.path.join(FIXTURES, "arrivals_board_rows.json"), "r") as json_file:
+        return json.load(json_file)
+
+
+def test_build_flight_reads_an_on_time_row():
+    record, scheduled = build_flight("arrivals", SCRAPE_DATE, board_rows()[0])
+    assert scheduled == datetime(2026, 10, 19, 6, 5)
+    assert record == ArrivalFlight(
+        flight_id="SQ321_2026-10-19 06:05:00",
+        flight_number="SQ321",
+        type="Arrival",
+        original_arrival_time="2026-10-19 06:05:00",
+        actual_arrival_time="2026-10-19 06:05:00",
+        airline_name="Singapore Airlines",
+        origin_country="London",
+        terminal="T3",
+        belt_number="42",
+        flight_status="LANDED 06:01",
+    )
+
+
+def test_build_flight_splits_previous_and_new_time():
+    record, scheduled = build_flight("arrivals", SCRAPE_DATE, board_rows()[1])
+    assert scheduled == datetime(2026, 10, 19, 7, 10)
+    assert record.original_arrival_time == "2026-10-19 07:10:00"
+    assert record.actual_arrival_time == "2026-10-19 07:45:00"
+    assert record.belt_number == "Unknown"
+
+
+def test_build_flight_moves_next_day_time_to_the_next_date():
+    record, scheduled = build_flight("arrivals", SCRAPE_DATE, board_rows()[2])
+    assert scheduled == datetime(2026, 10, 19, 23, 50)
+    assert record.flight_id == "EK404_2026-10-19 23:50:00"
+    assert record.actual_arrival_time == "2026-10-20 00:15:00"
+
+
+def test_build_flight_rejects_row_without_flight_number():
+    with pytest.raises(InvalidFlightError):
+        build_flight("arrivals", SCRAPE_DATE, board_rows()[3])
+
+
+def test_build_flight_skips_unparseable_time():
+    assert build_flight("arrivals", SCRAPE_DATE, board_rows()[4]) is None
+
+
+def test_build_flight_fills_departure_fields():
+    row = dict(board_rows()[0], gate_number="B4", belt_number=None, flight_status="GATE OPEN")
+    record, _ = build_flight("departures", SCRAPE_DATE, row)
+    assert record.destination == "London"
+    assert record.gate_number == "B4"
+    assert record.original_departure_time == "2026-10-19 06:05:00"
+
+
+def test_extract_rows_js_reads_saved_board():
+    cdp_engine = pytest.importorskip("cdp_engine")
+    try:
+        cdp_engine.find_chrome()
+    except cdp_engine.CDPError:
+        pytest.skip("Chrome is not installed")
+
+    async def extract():
+        browser = cdp_engine.Browser()
+        await browser.start()
+        try:
+            tab = await browser.new_tab()
+            await tab.send("Page.navigate", {"url": "file://" + BOARD_HTML})
+            await tab.wait_for("document.readyState === 'complete'", 10)
+            first = await tab.evaluate(f"{EXTRACT_ROWS_JS}(0, {json.dumps(PLACE_SELECTORS['arrival'])})")
+            pruned = await tab.evaluate(f"{PRUNE_ROWS_JS}(2)")
+            rest = await tab.evaluate(f"{EXTRACT_ROWS_JS}(2, {json.dumps(PLACE_SELECTORS['arrival'])})")
+            return first, pruned, rest
+        finally:
+            await browser.close()
+
+    first, pruned, rest = asyncio.run(extract())
+    assert first == {"count": 5, "rows": board_rows()}
+    # Pruning empties the rows that were read but keeps them, so the indices do not shift
+    assert pruned == 2
+    assert rest == {"count": 5, "rows": board_rows()[2:]}
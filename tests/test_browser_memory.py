@@ -0,0 +1,77 @@
+import asyncio
+import os
+from datetime import datetime
+
+import pytest
+
+import browser_memory
+from browser_memory import dom_nodes, js_heap_mb, process_tree_rss, restart_due, tab_over_budget
+
+
+def test_page_metrics():
+    metrics = [{"name": "Nodes", "value": 1234.0}, {"name": "JSHeapUsedSize", "value": 64 * 1024 * 1024}]
+    assert dom_nodes(metrics) == 1234
+    assert js_heap_mb(metrics) == 64
+    assert dom_nodes([]) == 0
+
+
+def test_tab_budget_ignores_shared_browser_memory():
+    assert not tab_over_budget(10, 1000)
+    assert tab_over_budget(browser_memory.MAX_TAB_HEAP_MB + 1, 1000)
+    assert tab_over_budget(10, browser_memory.MAX_DOM_NODES + 1)
+
+
+def test_restart_due_waits_for_rows_after_a_restart(monkeypatch):
+    monkeypatch.setattr(browser_memory, "MIN_ROWS_BETWEEN_RESTARTS", 100)
+    assert restart_due(True, 40, None)
+    assert not restart_due(False, 40, None)
+    assert not restart_due(True, 90, 40)
+    assert restart_due(True, 140, 40)
+
+
+def test_process_tree_rss_of_this_process():
+    if not os.path.isdir("/proc"):
+        pytest.skip("/proc is not available")
+    assert process_tree_rss(os.getpid()) > 0
+
+
+def test_scrape_date_over_budget_tab_is_not_reloaded_after_every_page(monkeypatch):
+    cdp_engine = pytest.importorskip("cdp_engine")
+    monkeypatch.setattr(browser_memory, "MIN_ROWS_BETWEEN_RESTARTS", 30)
+    rows = [
+        {"time": f"{hour:02d}:{minute:02d}", "previous_time": None, "flight_number": f"SQ{hour}{minute}",
+         "airline_name": "Singapore Airlines", "place": "London", "terminal": "T3", "belt_number": None,
+         "gate_number": None, "flight_status": "LANDED"}
+        for hour in range(24) for minute in (0, 30)
+    ]
+    opened = []
+
+    class Tab:
+        count = 10
+
+        async def row_count(self):
+            return self.count
+
+        async def extract_rows(self, start, place_selector):
+            return self.count, rows[start:self.count]
+
+        async def prune_rows(self, end):
+            return 0
+
+        async def memory_usage(self):
+            # Always over budget, as when the budget is below what a fresh page needs
+            return browser_memory.MAX_TAB_HEAP_MB * 2, 10
+
+        async def load_more(self, previous_count):
+            if self.count >= len(rows):
+                return False
+            self.count = min(len(rows), self.count + 10)
+            return True
+
+    async def open_date(tab, board, date, index=0, breaker=None):
+        opened.append(index)
+
+    monkeypatch.setattr(cdp_engine, "open_date", open_date)
+    records = asyncio.run(cdp_engine.scrape_date(Tab(), "arrivals", datetime(2026, 10, 19)))
+    assert len(records) == 48
+    assert opened == [0, 10, 40]
@@ -0,0 +1,181 @@
+import asyncio
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+cdp_engine = pytest.importorskip("cdp_engine")
+from cdp_engine import feed_items, flight_from_feed, flights_from_feed, parse_feed_time
+from flight_records import FreighterArrivalFlight, InvalidFlightError
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def feed_payload():
+    with open(os.path.join(FIXTURES, "feed_payload.json"), "r") as json_file:
+        return json.load(json_file)
+
+
+def test_parse_feed_time_epoch_milliseconds_and_seconds():
+    assert parse_feed_time(1792361100000) == datetime(2026, 10, 19, 6, 5)
+    assert parse_feed_time(1792361100) == datetime(2026, 10, 19, 6, 5)
+
+
+def test_parse_feed_time_converts_utc_iso_to_singapore_time():
+    assert parse_feed_time("2026-10-18T23:10:00Z") == datetime(2026, 10, 19, 7, 10)
+    assert parse_feed_time("2026-10-19T07:10:00+08:00") == datetime(2026, 10, 19, 7, 10)
+
+
+def test_parse_feed_time_keeps_naive_local_time():
+    assert parse_feed_time("2026-10-19 23:50") == datetime(2026, 10, 19, 23, 50)
+
+
+def test_feed_items_finds_nested_flights_only():
+    items = list(feed_items(feed_payload()))
+    assert [item.get("flight_number") or item.get("flightNumber") or item.get("flight_no") for item in items] == ["SQ321", "TR8", "EK404", "QF1"]
+
+
+def test_flight_from_feed_epoch_times_and_landed_suffix():
+    item = feed_payload()["data"]["getFlights"]["flights"][0]
+    record, scheduled = flight_from_feed("arrivals", item)
+    assert scheduled == datetime(2026, 10, 19, 6, 5)
+    assert record.flight_id == "SQ321_2026-10-19 06:05:00"
+    assert record.actual_arrival_time == "2026-10-19 06:01:00"
+    assert record.flight_status == "LANDED 06:01"
+    assert record.airline_name == "Singapore Airlines"
+    assert record.origin_country == "London"
+    assert (record.terminal, record.belt_number) == ("3", "42")
+
+
+def test_flight_from_feed_iso_times():
+    item = feed_payload()["data"]["getFlights"]["flights"][1]
+    record, scheduled = flight_from_feed("arrivals", item)
+    assert scheduled == datetime(2026, 10, 19, 7, 10)
+    assert record.actual_arrival_time == "2026-10-19 07:45:00"
+    assert record.flight_status == "DELAYED"
+    assert (record.terminal, record.belt_number) == ("Unknown", "Unknown")
+
+
+def test_flight_from_feed_split_date_and_new_gate_suffix():
+    item = feed_payload()["data"]["getFlights"]["flights"][2]
+    record, scheduled = flight_from_feed("departures", item)
+    assert scheduled == datetime(2026, 10, 19, 23, 50)
+    assert record.original_departure_time == "2026-10-19 23:50:00"
+    assert record.actual_departure_time == "2026-10-19 23:50:00"
+    assert record.destination == "Dubai"
+    assert record.gate_number == "B4"
+    assert record.flight_status == "NEW GATE B4"
+
+
+def test_flight_from_feed_skips_unusable_schedule():
+    item = feed_payload()["data"]["getFlights"]["flights"][3]
+    assert flight_from_feed("arrivals", item) is None
+
+
+def test_flight_from_feed_rejects_items_without_airline_place_or_status():
+    item = feed_payload()["data"]["getFlights"]["flights"][0]
+    for key in ("airline_details", "origin_name", "flight_status"):
+        with pytest.raises(InvalidFlightError, match="SQ321"):
+            flight_from_feed("arrivals", {name: value for name, value in item.items() if name != key})
+
+
+def feed_item(flight_number, status="On Schedule", **fields):
+    item = {"flight_number": flight_number, "scheduled_datetime": 1792361100000, "airline_name": "Singapore Airlines",
+            "origin_name": "London", "flight_status": status}
+    item.update(fields)
+    return {name: value for name, value in item.items() if value is not None}
+
+
+def test_flights_from_feed_later_responses_win():
+    first = {"flights": [feed_item("SQ321")]}
+    later = {"flights": [feed_item("SQ321", "Landed")]}
+    flights, items, rejected = flights_from_feed("freighter_arrivals", [first, later])
+    assert list(flights) == ["SQ321_2026-10-19 06:05:00"]
+    assert flights["SQ321_2026-10-19 06:05:00"][0].flight_status == "LANDED 06:05"
+    assert (items, rejected) == (2, 0)
+
+
+def test_flights_from_feed_counts_rejected_items():
+    payload = {"flights": [feed_item("SQ321"), feed_item("SQ322", airline_name=None), feed_item("SQ323", scheduled_datetime="soon")]}
+    flights, items, rejected = flights_from_feed("freighter_arrivals", [payload])
+    assert list(flights) == ["SQ321_2026-10-19 06:05:00"]
+    assert (items, rejected) == (3, 2)
+
+
+class FakeCapture:
+    """Stands in for ResponseCapture: each "Load more" delivers the next page of the feed."""
+
+    pages = []
+
+    def __init__(self, tab):
+        self.bodies = []
+        self.taken = 0
+
+    async def start(self):
+        pass
+
+    async def settle(self):
+        pass
+
+    def take(self):
+        bodies, self.bodies = self.bodies, []
+        self.taken += len(bodies)
+        return bodies
+
+    async def wait_for_response(self, timeout):
+        if not FakeCapture.pages:
+            raise asyncio.TimeoutError()
+        self.bodies.append(FakeCapture.pages.pop(0))
+
+
+def feed_page(day, hours, airline_name="Singapore Airlines"):
+    return {"flights": [
+        feed_item(f"SQ{day}{hour:02d}", scheduled_datetime=None, scheduled_date=f"2026-10-{day}", scheduled_time=f"{hour:02d}:00", airline_name=airline_name)
+        for hour in hours
+    ]}
+
+
+@pytest.fixture
+def fake_tab(monkeypatch):
+    """Returns a tab whose feed delivers FakeCapture.pages, and the dates picked on it."""
+    picks = []
+
+    async def no_op(*args, **kwargs):
+        pass
+
+    async def select_date(tab, board, date, breaker=None):
+        picks.append(date)
+
+    class Tab:
+        click_load_more = staticmethod(no_op)
+
+    monkeypatch.setattr(cdp_engine, "ResponseCapture", FakeCapture)
+    monkeypatch.setattr(cdp_engine, "open_board", no_op)
+    monkeypatch.setattr(cdp_engine, "select_date", select_date)
+    return Tab(), picks
+
+
+def test_scrape_horizon_from_feed_covers_several_days_from_one_pick(fake_tab):
+    tab, picks = fake_tab
+    FakeCapture.pages = [feed_page(19, range(0, 12)), feed_page(19, range(12, 24)), feed_page(20, range(0, 24)), feed_page(21, range(0, 3))]
+    dates = [datetime(2026, 10, 19), datetime(2026, 10, 20)]
+    records = asyncio.run(cdp_engine.scrape_horizon_from_feed(tab, "freighter_arrivals", dates))
+
+    assert picks == [datetime(2026, 10, 19)]
+    assert len(records) == 48
+    assert records[0].flight_id == "SQ1900_2026-10-19 00:00:00"
+    assert records[-1].flight_id == "SQ2023_2026-10-20 23:00:00"
+
+
+def test_scrape_horizon_from_feed_reads_the_page_when_most_items_are_unreadable(fake_tab, monkeypatch, freighter_arrival):
+    tab, picks = fake_tab
+    FakeCapture.pages = [feed_page(19, range(0, 2)), feed_page(19, range(2, 24), airline_name=None)]
+    from_page = [FreighterArrivalFlight(**freighter_arrival(f"FX{hour}", f"2026-10-19 {hour:02d}:00:00")) for hour in range(24)]
+
+    async def scrape_date(tab, board, date, checkpoint=None, breaker=None):
+        return from_page
+
+    monkeypatch.setattr(cdp_engine, "scrape_date", scrape_date)
+    records = asyncio.run(cdp_engine.scrape_horizon_from_feed(tab, "freighter_arrivals", [datetime(2026, 10, 19)]))
+    assert records == from_page
@@ -0,0 +1,73 @@
+import json
+import os
+
+import chrome_profile
+from chrome_profile import ensure_profile, profile_args, profile_dir
+
+
+def write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as out:
+        out.write(data)
+
+
+def make_profile(path):
+    write(os.path.join(path, "Local State"), json.dumps({"browser": {}}).encode())
+    write(os.path.join(path, "Default", "Preferences"), json.dumps({"profile": {}}).encode())
+    write(os.path.join(path, "Default", "Cookies"), b"cookies")
+
+
+def test_healthy_profile_is_kept(tmp_path):
+    profile = str(tmp_path / "board")
+    make_profile(profile)
+    write(os.path.join(profile, "Default", "Cache", "data_0"), b"x" * 1024)
+    ensure_profile(profile, cache_size_mb=1)
+    assert os.path.exists(os.path.join(profile, "Default", "Cookies"))
+    assert os.path.exists(os.path.join(profile, "Default", "Cache", "data_0"))
+
+
+def test_unparseable_local_state_discards_the_profile(tmp_path):
+    profile = str(tmp_path / "board")
+    make_profile(profile)
+    write(os.path.join(profile, "Local State"), b'{"browser": ')
+    ensure_profile(profile)
+    assert os.path.isdir(profile)
+    assert os.listdir(profile) == []
+
+
+def test_stale_locks_are_removed(tmp_path):
+    profile = str(tmp_path / "board")
+    make_profile(profile)
+    # Chrome's SingletonLock is a symlink to a host-pid that no longer exists
+    os.symlink("runner-1234", os.path.join(profile, "SingletonLock"))
+    write(os.path.join(profile, "DevToolsActivePort"), b"9222\n/devtools/browser/x")
+    ensure_profile(profile)
+    assert not os.path.lexists(os.path.join(profile, "SingletonLock"))
+    assert not os.path.exists(os.path.join(profile, "DevToolsActivePort"))
+    assert os.path.exists(os.path.join(profile, "Default", "Cookies"))
+
+
+def test_cache_over_twice_the_cap_is_cleared(tmp_path):
+    profile = str(tmp_path / "board")
+    make_profile(profile)
+    write(os.path.join(profile, "Default", "Cache", "data_0"), b"x" * (1024 * 1024))
+    write(os.path.join(profile, "Default", "Code Cache", "js", "index"), b"x" * (1024 * 1024 + 1))
+    ensure_profile(profile, cache_size_mb=1)
+    assert not os.path.exists(os.path.join(profile, "Default", "Cache"))
+    assert not os.path.exists(os.path.join(profile, "Default", "Code Cache"))
+    assert os.path.exists(os.path.join(profile, "Default", "Cookies"))
+
+
+def test_cache_up_to_twice_the_cap_is_kept(tmp_path):
+    profile = str(tmp_path / "board")
+    make_profile(profile)
+    write(os.path.join(profile, "Default", "Cache", "data_0"), b"x" * (2 * 1024 * 1024))
+    ensure_profile(profile, cache_size_mb=1)
+    assert os.path.exists(os.path.join(profile, "Default", "Cache", "data_0"))
+
+
+def test_profiles_are_per_scraper_and_only_when_enabled(tmp_path, monkeypatch):
+    monkeypatch.setattr(chrome_profile, "PROFILE_ROOT", None)
+    assert profile_dir("arrivals") is None
+    assert profile_dir("arrivals", root=str(tmp_path)) == os.path.join(str(tmp_path), "arrivals")
+    assert profile_args("/profiles/arrivals", cache_size_mb=200) == ["--user-data-dir=/profiles/arrivals", f"--disk-cache-size={200 * 1024 * 1024}"]
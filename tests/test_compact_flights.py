@@ -0,0 +1,102 @@
+import os
+
+from compact_flights import compact_board, compact_shard
+from flight_rollups import load_rollups
+from flight_store import load_shard, save_shards, shard_dates, shard_path
+
+
+def test_legacy_time_only_id_is_normalised(freighter_arrival):
+    legacy = freighter_arrival("FX5194", status="LANDED 14:23", flight_id="2024-08-20 14:45:00")
+    compacted, invalid, duplicates, renamed = compact_shard("freighter_arrivals", [legacy])
+    assert compacted == [dict(legacy, flight_id="FX5194_2024-08-20 14:45:00")]
+    assert (invalid, duplicates, renamed) == (0, 0, 1)
+
+
+def test_legacy_id_and_new_id_are_deduplicated(freighter_arrival):
+    legacy = freighter_arrival("FX5194", status="CONFIRMED 14:23", flight_id="2024-08-20 14:45:00")
+    current = freighter_arrival("FX5194", status="LANDED 14:23")
+    compacted, _, duplicates, _ = compact_shard("freighter_arrivals", [legacy, current])
+    assert compacted == [current]
+    assert duplicates == 1
+
+
+def test_later_copy_wins(freighter_arrival):
+    cancelled = freighter_arrival("FX5194", status="CANCELLED")
+    retimed = freighter_arrival("FX5194", status="RE-TIMED 15:30", actual="2024-08-20 15:30:00")
+    compacted, _, duplicates, _ = compact_shard("freighter_arrivals", [cancelled, retimed])
+    assert compacted == [retimed]
+    assert duplicates == 1
+
+
+def test_later_copy_takes_the_first_position(freighter_arrival):
+    first = freighter_arrival("FX5194", status="LANDED 14:23")
+    other = freighter_arrival("5X166", status="LANDED 14:30")
+    later = freighter_arrival("FX5194", status="LANDED 14:25", actual="2024-08-20 14:25:00")
+    compacted, _, duplicates, _ = compact_shard("freighter_arrivals", [first, other, later])
+    assert compacted == [later, other]
+    assert duplicates == 1
+
+
+def test_copy_back_on_schedule_does_not_replace_a_settled_one(freighter_arrival):
+    legacy = freighter_arrival("FX5194", status="LANDED 14:23", actual="2024-08-20 14:23:00", flight_id="2024-08-20 14:45:00")
+    current = freighter_arrival("FX5194", status="ON SCHEDULE")
+    compacted, _, duplicates, renamed = compact_shard("freighter_arrivals", [legacy, current])
+    assert compacted == [dict(legacy, flight_id="FX5194_2024-08-20 14:45:00")]
+    assert (duplicates, renamed) == (1, 1)
+
+
+def test_passenger_departures_only_change_on_a_new_gate_or_time():
+    def departure(status, gate):
+        return {
+            "flight_id": "SQ22_2024-08-20 23:45:00",
+            "flight_number": "SQ22",
+            "type": "Departure",
+            "original_departure_time": "2024-08-20 23:45:00",
+            "actual_departure_time": "2024-08-20 23:45:00",
+            "airline_name": "Singapore Airlines",
+            "destination": "Newark",
+            "terminal": "3",
+            "gate_number": gate,
+            "flight_status": status,
+        }
+
+    first = departure("ON SCHEDULE", "Unknown")
+    gate_open = departure("GATE OPEN", "A12")
+    new_gate = departure("NEW GATE A14", "A14")
+    compacted, _, duplicates, _ = compact_shard("departures", [first, gate_open, new_gate])
+    assert compacted == [new_gate]
+    assert duplicates == 2
+
+
+def test_invalid_rows_are_dropped(freighter_arrival):
+    no_number = freighter_arrival("", status="LANDED 14:23")
+    bad_time = dict(freighter_arrival("5X166", status="LANDED 14:23"), actual_arrival_time="14:23")
+    extra_field = dict(freighter_arrival("2Y930", status="CANCELLED"), gate_number="Unknown")
+    valid = freighter_arrival("FX5194", status="LANDED 14:23")
+    compacted, invalid, _, _ = compact_shard("freighter_arrivals", [no_number, bad_time, extra_field, valid])
+    assert compacted == [valid]
+    assert invalid == 3
+
+
+def test_dropped_rows_are_not_counted_as_renamed(freighter_arrival):
+    legacy_without_number = freighter_arrival("", flight_id="2024-08-20 14:45:00")
+    compacted, invalid, _, renamed = compact_shard("freighter_arrivals", [legacy_without_number])
+    assert compacted == []
+    assert (invalid, renamed) == (1, 0)
+
+
+def test_compact_board_rewrites_the_shards_and_their_rollups(tmp_path, freighter_arrival):
+    legacy = freighter_arrival("FX5194", status="CONFIRMED 14:23", flight_id="2024-08-20 14:45:00")
+    current = freighter_arrival("FX5194", status="LANDED 14:23")
+    blank = freighter_arrival("", "2024-08-21 01:10:00", flight_id="_2024-08-21 01:10:00")
+    clean = freighter_arrival("5X166", "2024-08-22 09:00:00")
+    save_shards("freighter_arrivals", [legacy, current, blank, clean], tmp_path)
+    untouched = os.stat(shard_path("freighter_arrivals", "2024-08-22", tmp_path)).st_mtime_ns
+
+    compact_board("freighter_arrivals", tmp_path, workers=1)
+    assert shard_dates("freighter_arrivals", tmp_path) == ["2024-08-20", "2024-08-22"]
+    assert load_shard("freighter_arrivals", "2024-08-20", tmp_path) == [current]
+    assert os.stat(shard_path("freighter_arrivals", "2024-08-22", tmp_path)).st_mtime_ns == untouched
+    rollups = load_rollups("freighter_arrivals", tmp_path)
+    assert list(rollups["dates"]) == ["2024-08-20"]
+    assert rollups["dates"]["2024-08-20"]["number_of_flights"] == 1
@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+import flight_store
+from flight_records import FreighterArrivalFlight, InvalidFlightError, merge_into_store
+from flight_rollups import load_rollups
+from flight_store import load_shard, save_shards, shard_path
+
+
+def test_records_reject_malformed_times(freighter_arrival):
+    with pytest.raises(InvalidFlightError):
+        FreighterArrivalFlight(**freighter_arrival("FX1", "2026-10-19T06:00:00"))
+    with pytest.raises(InvalidFlightError):
+        FreighterArrivalFlight(**freighter_arrival("FX1", "2026-10-19 06:00:00", actual="06:00"))
+
+
+def test_unknown_statuses_are_logged_once(capsys, freighter_arrival):
+    FreighterArrivalFlight(**freighter_arrival("FX1", "2026-10-19 06:00:00", status="HOLDING PATTERN"))
+    FreighterArrivalFlight(**freighter_arrival("FX2", "2026-10-19 07:00:00", status="HOLDING PATTERN"))
+    assert capsys.readouterr().out.count("Unknown flight status: 'HOLDING PATTERN'") == 1
+
+
+def test_merge_reads_and_writes_only_the_scraped_dates(tmp_path, monkeypatch, freighter_arrival):
+    archived = [
+        freighter_arrival("FX1", "2026-10-18 06:00:00"),
+        freighter_arrival("FX1", "2026-10-19 06:00:00", status="ON SCHEDULE"),
+        freighter_arrival("FX2", "2026-10-19 09:00:00", status="LANDED 08:50"),
+    ]
+    save_shards("freighter_arrivals", archived, tmp_path)
+    untouched = os.stat(shard_path("freighter_arrivals", "2026-10-18", tmp_path)).st_mtime_ns
+    loaded = []
+    monkeypatch.setattr(flight_store, "load_shard", lambda board, date, data_dir=".": loaded.append(date) or load_shard(board, date, data_dir))
+
+    scraped = [
+        FreighterArrivalFlight(**freighter_arrival("FX1", "2026-10-19 06:00:00", status="LANDED 05:55", actual="2026-10-19 05:55:00")),
+        FreighterArrivalFlight(**freighter_arrival("FX2", "2026-10-19 09:00:00", status="ON SCHEDULE")),
+        FreighterArrivalFlight(**freighter_arrival("FX3", "2026-10-20 01:00:00")),
+    ]
+    merge_into_store("freighter_arrivals", scraped, ["2026-10-19"], tmp_path)
+
+    assert loaded == ["2026-10-19", "2026-10-20"]
+    assert os.stat(shard_path("freighter_arrivals", "2026-10-18", tmp_path)).st_mtime_ns == untouched
+    statuses = {flight["flight_id"]: flight["flight_status"] for flight in load_shard("freighter_arrivals", "2026-10-19", tmp_path)}
+    # A flight back ON SCHEDULE keeps the status it already had
+    assert statuses == {"FX1_2026-10-19 06:00:00": "LANDED 05:55", "FX2_2026-10-19 09:00:00": "LANDED 08:50"}
+    assert [flight["flight_id"] for flight in load_shard("freighter_arrivals", "2026-10-20", tmp_path)] == ["FX3_2026-10-20 01:00:00"]
+    assert list(load_rollups("freighter_arrivals", tmp_path)["dates"]) == ["2026-10-19", "2026-10-20"]
@@ -0,0 +1,36 @@
+from flight_rollups import load_rollups, update_rollups
+
+
+def test_only_touched_dates_are_recomputed(tmp_path, freighter_arrival):
+    flights = [
+        freighter_arrival("FX1", "2026-10-18 06:00:00"),
+        freighter_arrival("FX1", "2026-10-19 06:00:00", actual="2026-10-19 06:30:00"),
+        freighter_arrival("FX2", "2026-10-19 09:00:00", status="CANCELLED"),
+    ]
+    update_rollups("freighter_arrivals", flights, data_dir=tmp_path)
+    assert list(load_rollups("freighter_arrivals", tmp_path)["dates"]) == ["2026-10-18", "2026-10-19"]
+
+    # Only the 19th is passed in; the 18th keeps its rollup and the 20th gets one
+    rescraped = [freighter_arrival("FX2", "2026-10-19 09:00:00", status="LANDED 09:10", actual="2026-10-19 09:10:00"),
+                 freighter_arrival("FX3", "2026-10-20 01:00:00")]
+    rollups = update_rollups("freighter_arrivals", rescraped, ["2026-10-19", "2026-10-20"], tmp_path)
+    assert rollups["dates"]["2026-10-18"]["number_of_flights"] == 1
+    day = rollups["dates"]["2026-10-19"]
+    assert (day["number_of_flights"], day["cancelled"], day["average_delay_minutes"], day["delayed_flights"]) == (1, 0, 10.0, 1)
+    assert rollups["dates"]["2026-10-20"]["per_airline"] == {"Federal Express": 1}
+    assert load_rollups("freighter_arrivals", tmp_path) == rollups
+
+
+def test_touched_date_without_flights_is_dropped(tmp_path, freighter_arrival):
+    update_rollups("freighter_arrivals", [freighter_arrival("FX1", "2026-10-18 06:00:00"), freighter_arrival("FX1", "2026-10-19 06:00:00")], data_dir=tmp_path)
+    rollups = update_rollups("freighter_arrivals", [], ["2026-10-19"], tmp_path)
+    assert list(rollups["dates"]) == ["2026-10-18"]
+
+
+def test_flights_without_a_time_are_skipped(tmp_path, freighter_arrival):
+    undated = freighter_arrival("FX9", "")
+    del undated["original_arrival_time"]
+    blank = freighter_arrival("FX8", "")
+    rollups = update_rollups("freighter_arrivals", [undated, blank, freighter_arrival("FX1", "2026-10-19 06:00:00")], ["2026-10-19"], tmp_path)
+    assert list(rollups["dates"]) == ["2026-10-19"]
+    assert rollups["dates"]["2026-10-19"]["number_of_flights"] == 1
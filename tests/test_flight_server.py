@@ -0,0 +1,72 @@
+import asyncio
+import gzip
+import json
+
+from flight_server import FlightServer
+from flight_store import save_shards
+
+
+def get(server, target, **headers):
+    status, extra, body = server.respond("GET", target, {name.replace("_", "-"): value for name, value in headers.items()})
+    return status, extra, body
+
+
+def serve(tmp_path, freighter_arrival, departures=()):
+    arrivals = [freighter_arrival(f"FX{n}", f"2026-10-19 {n % 24:02d}:00:00") for n in range(30)]
+    save_shards("freighter_arrivals", arrivals, tmp_path)
+    save_shards("freighter_departures", list(departures), tmp_path)
+    server = FlightServer(tmp_path)
+    asyncio.run(server.refresh())
+    return server, arrivals
+
+
+def test_matching_etag_gets_304(tmp_path, freighter_arrival):
+    server, _ = serve(tmp_path, freighter_arrival)
+    status, extra, body = get(server, "/flights?board=freighter_arrivals&date=2026-10-19")
+    assert status == 200
+    assert json.loads(body)["number_of_flights"] == 30
+
+    status, _, body = get(server, "/flights?board=freighter_arrivals&date=2026-10-19", if_none_match=extra["ETag"])
+    assert (status, body) == (304, b"")
+
+
+def test_large_bodies_are_gzipped_on_request(tmp_path, freighter_arrival):
+    server, _ = serve(tmp_path, freighter_arrival)
+    _, plain_headers, plain = get(server, "/flights?board=freighter_arrivals")
+    _, extra, body = get(server, "/flights?board=freighter_arrivals", accept_encoding="gzip, br")
+    assert "Content-Encoding" not in plain_headers
+    assert extra["Content-Encoding"] == "gzip"
+    assert gzip.decompress(body) == plain
+
+
+def test_rewriting_a_board_only_changes_its_etags(tmp_path, freighter_arrival):
+    server, arrivals = serve(tmp_path, freighter_arrival)
+    targets = ["/flights?board=freighter_arrivals", "/flights?board=freighter_departures", "/flights", "/boards"]
+    before = {target: get(server, target)[1]["ETag"] for target in targets}
+
+    save_shards("freighter_arrivals", arrivals[:-1] + [dict(arrivals[-1], flight_status="CANCELLED")], tmp_path)
+    asyncio.run(server.refresh())
+    after = {target: get(server, target)[1]["ETag"] for target in targets}
+    assert after["/flights?board=freighter_departures"] == before["/flights?board=freighter_departures"]
+    assert all(after[target] != before[target] for target in targets if "departures" not in target)
+    statuses = [flight["flight_status"] for flight in json.loads(get(server, "/flights?board=freighter_arrivals")[2])["flights"]]
+    assert "CANCELLED" in statuses
+
+
+def test_rows_without_a_time_are_served_undated(tmp_path, freighter_arrival):
+    undated = freighter_arrival("FX9", "")
+    del undated["original_arrival_time"]
+    server, _ = serve(tmp_path, freighter_arrival)
+    save_shards("freighter_arrivals", [undated], tmp_path)
+    asyncio.run(server.refresh())
+
+    boards = json.loads(get(server, "/boards")[2])["boards"]
+    assert boards["freighter_arrivals"]["dates"] == ["2026-10-19"]
+    assert boards["freighter_arrivals"]["number_of_flights"] == 31
+    _, _, body = get(server, "/flights?board=freighter_arrivals&airline=federal%20express")
+    assert json.loads(body)["number_of_flights"] == 31
+
+
+def test_unknown_board_is_a_bad_request(tmp_path, freighter_arrival):
+    server, _ = serve(tmp_path, freighter_arrival)
+    assert get(server, "/flights?board=cargo")[0] == 400
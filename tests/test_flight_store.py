@@ -0,0 +1,74 @@
+import os
+
+import pytest
+
+import flight_store
+from flight_store import atomic_write, rotate_backups
+
+
+def read(path):
+    with open(path, "r") as text_file:
+        return text_file.read()
+
+
+def test_atomic_write_replaces_the_file_and_leaves_no_temp_file(tmp_path):
+    path = tmp_path / "store.json"
+    atomic_write(path, "old", backups=0)
+    atomic_write(path, "new", backups=0)
+    assert read(path) == "new"
+    assert os.listdir(tmp_path) == ["store.json"]
+
+
+def test_atomic_write_gives_the_file_umask_permissions(tmp_path):
+    umask = os.umask(0o022)
+    try:
+        atomic_write(tmp_path / "store.json", "{}", backups=0)
+    finally:
+        os.umask(umask)
+    assert os.stat(tmp_path / "store.json").st_mode & 0o777 == 0o644
+
+
+def test_failed_write_keeps_the_old_file_and_removes_the_temp_file(tmp_path, monkeypatch):
+    path = tmp_path / "store.json"
+    atomic_write(path, "old", backups=0)
+
+    def failing_replace(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(flight_store.os, "replace", failing_replace)
+    with pytest.raises(OSError, match="disk full"):
+        atomic_write(path, "new", backups=0)
+    assert read(path) == "old"
+    assert os.listdir(tmp_path) == ["store.json"]
+
+
+def test_backups_keep_the_previous_versions_newest_first(tmp_path):
+    path = tmp_path / "store.json"
+    for version in ("v1", "v2", "v3", "v4"):
+        atomic_write(path, version, backups=2)
+    assert read(path) == "v4"
+    assert read(f"{path}.bak.1") == "v3"
+    assert read(f"{path}.bak.2") == "v2"
+    assert sorted(os.listdir(tmp_path)) == ["store.json", "store.json.bak.1", "store.json.bak.2"]
+
+
+def test_backup_survives_the_rewrite_of_a_hard_linked_store(tmp_path):
+    path = tmp_path / "store.json"
+    atomic_write(path, "v1", backups=0)
+    rotate_backups(str(path), 1)
+    assert os.path.samefile(path, f"{path}.bak.1")
+    atomic_write(path, "v2", backups=0)
+    assert (read(path), read(f"{path}.bak.1")) == ("v2", "v1")
+
+
+def test_rotate_backups_copies_when_hard_links_fail(tmp_path, monkeypatch):
+    path = tmp_path / "store.json"
+    atomic_write(path, "v1", backups=0)
+
+    def no_link(src, dst):
+        raise OSError("links not supported")
+
+    monkeypatch.setattr(flight_store.os, "link", no_link)
+    rotate_backups(str(path), 1)
+    assert read(f"{path}.bak.1") == "v1"
+    assert not os.path.samefile(path, f"{path}.bak.1")
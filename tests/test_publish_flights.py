@@ -0,0 +1,51 @@
+import json
+import os
+
+from flight_store import board_path, load_board, load_flights, save_flights, shard_path
+from publish_flights import publish_board, restore_board
+
+
+def test_publish_writes_sorted_line_per_record_shards(tmp_path, freighter_arrival):
+    flights = [freighter_arrival("FX2", "2026-10-19 09:00:00"), freighter_arrival("FX1", "2026-10-20 06:00:00"), freighter_arrival("FX1", "2026-10-19 06:00:00")]
+    save_flights(board_path("freighter_arrivals", tmp_path), flights)
+
+    changed = publish_board("freighter_arrivals", tmp_path)
+    assert sorted(changed) == [shard_path("freighter_arrivals", date, tmp_path) for date in ("2026-10-19", "2026-10-20")]
+    with open(shard_path("freighter_arrivals", "2026-10-19", tmp_path)) as shard_file:
+        lines = shard_file.read().splitlines()
+    assert [json.loads(line)["flight_id"] for line in lines] == ["FX1_2026-10-19 06:00:00", "FX2_2026-10-19 09:00:00"]
+
+
+def test_publish_rewrites_only_changed_shards(tmp_path, freighter_arrival):
+    store = board_path("freighter_arrivals", tmp_path)
+    save_flights(store, [freighter_arrival("FX1", "2026-10-19 06:00:00"), freighter_arrival("FX1", "2026-10-20 06:00:00")])
+    publish_board("freighter_arrivals", tmp_path)
+    assert publish_board("freighter_arrivals", tmp_path) == []
+
+    # Scrape order does not matter, only the flights themselves
+    save_flights(store, [freighter_arrival("FX1", "2026-10-20 06:00:00", status="CANCELLED"), freighter_arrival("FX1", "2026-10-19 06:00:00")])
+    assert publish_board("freighter_arrivals", tmp_path) == [shard_path("freighter_arrivals", "2026-10-20", tmp_path)]
+
+    save_flights(store, [freighter_arrival("FX1", "2026-10-19 06:00:00")])
+    assert publish_board("freighter_arrivals", tmp_path) == [shard_path("freighter_arrivals", "2026-10-20", tmp_path)]
+    assert not os.path.exists(shard_path("freighter_arrivals", "2026-10-20", tmp_path))
+
+
+def test_board_without_store_is_not_unpublished(tmp_path, freighter_arrival):
+    save_flights(board_path("freighter_arrivals", tmp_path), [freighter_arrival("FX1", "2026-10-19 06:00:00")])
+    publish_board("freighter_arrivals", tmp_path)
+    os.remove(board_path("freighter_arrivals", tmp_path))
+    assert publish_board("freighter_arrivals", tmp_path) == []
+    assert os.path.exists(shard_path("freighter_arrivals", "2026-10-19", tmp_path))
+
+
+def test_restore_rebuilds_the_store(tmp_path, freighter_arrival):
+    flights = [freighter_arrival("FX1", "2026-10-19 06:00:00"), freighter_arrival("FX2", "2026-10-20 07:00:00"), freighter_arrival("FX3", "")]
+    save_flights(board_path("freighter_arrivals", tmp_path), flights)
+    publish_board("freighter_arrivals", tmp_path)
+    assert sorted(map(json.dumps, load_board("freighter_arrivals", tmp_path))) == sorted(map(json.dumps, flights))
+    os.remove(board_path("freighter_arrivals", tmp_path))
+
+    restore_board("freighter_arrivals", tmp_path)
+    restored = load_flights(board_path("freighter_arrivals", tmp_path))
+    assert sorted(map(json.dumps, restored)) == sorted(map(json.dumps, flights))
@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+import retry_policy
+from retry_policy import CircuitBreaker, CircuitOpenError, StageError, retry, retry_async
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(retry_policy, "BACKOFF_SECONDS", 0)
+
+
+class Flaky:
+    """Fails with TimeoutError `failures` times, then returns "ok"."""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise TimeoutError(f"attempt {self.calls}")
+        return "ok"
+
+    async def run(self):
+        return self()
+
+
+def test_retry_recovers_from_transient_failures():
+    operation = Flaky(2)
+    recovered = []
+    assert retry("rows", operation, TimeoutError, retries=3, recover=lambda: recovered.append(True)) == "ok"
+    assert operation.calls == 3
+    assert len(recovered) == 2
+
+
+def test_retry_raises_stage_error_after_last_retry():
+    operation = Flaky(10)
+    with pytest.raises(StageError) as raised:
+        retry("load_more", operation, TimeoutError, retries=2)
+    assert operation.calls == 3
+    assert raised.value.stage == "load_more"
+    assert isinstance(raised.value.error, TimeoutError)
+
+
+def test_retry_does_not_catch_other_errors():
+    def broken():
+        raise KeyError("bug")
+
+    with pytest.raises(KeyError):
+        retry("rows", broken, TimeoutError)
+
+
+def test_retry_async_recovers_and_gives_up():
+    operation = Flaky(1)
+    assert asyncio.run(retry_async("navigate", operation.run, TimeoutError, retries=1)) == "ok"
+
+    operation = Flaky(5)
+    with pytest.raises(StageError):
+        asyncio.run(retry_async("navigate", operation.run, TimeoutError, retries=1))
+    assert operation.calls == 2
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(threshold=3)
+    operation = Flaky(10)
+    with pytest.raises(CircuitOpenError):
+        retry("navigate", operation, TimeoutError, breaker=breaker, retries=5)
+    assert operation.calls == 3
+
+    # Once open, the next stage fails without running at all
+    other = Flaky(0)
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(retry_async("choose_date", other.run, TimeoutError, breaker=breaker))
+    assert other.calls == 0
+
+
+def test_breaker_closes_again_on_success():
+    breaker = CircuitBreaker(threshold=3)
+    for _ in range(3):
+        assert retry("rows", Flaky(2), TimeoutError, breaker=breaker, retries=2) == "ok"
+    assert breaker.failures == 0
+
+
+def test_nested_retry_passes_open_breaker_through():
+    breaker = CircuitBreaker(threshold=2)
+
+    def date_stage():
+        return retry("load_more", Flaky(10), TimeoutError, breaker=breaker, retries=5)
+
+    with pytest.raises(CircuitOpenError):
+        retry("date", date_stage, StageError, breaker=breaker, retries=3)
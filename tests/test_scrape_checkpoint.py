@@ -0,0 +1,55 @@
+from datetime import datetime
+
+import pytest
+
+from flight_records import FreighterArrivalFlight
+from scrape_checkpoint import ScrapeCheckpoint
+
+DATES = ["2026-10-19", "2026-10-20"]
+
+
+@pytest.fixture
+def record(freighter_arrival):
+    return lambda flight_number, scheduled: FreighterArrivalFlight(**freighter_arrival(flight_number, scheduled))
+
+
+def test_retry_of_the_same_run_resumes_from_the_cursor(tmp_path, record):
+    checkpoint = ScrapeCheckpoint.load("freighter_arrivals", DATES, tmp_path, run_id="101")
+    checkpoint.save_page("2026-10-19", [record("FX1", "2026-10-19 06:00:00")], 40, datetime(2026, 10, 19, 6, 0))
+
+    resumed = ScrapeCheckpoint.load("freighter_arrivals", DATES, tmp_path, run_id="101")
+    assert resumed.cursor("2026-10-19") == (False, 40, datetime(2026, 10, 19, 6, 0))
+    assert resumed.cursor("2026-10-20") == (False, 0, None)
+    assert [flight.flight_id for flight in resumed.records()] == ["FX1_2026-10-19 06:00:00"]
+    assert not resumed.complete()
+
+
+def test_a_later_run_scrapes_done_dates_again(tmp_path, record):
+    checkpoint = ScrapeCheckpoint.load("freighter_arrivals", DATES, tmp_path, run_id="101")
+    checkpoint.save_page("2026-10-19", [record("FX1", "2026-10-19 06:00:00")], 40, datetime(2026, 10, 19, 6, 0), done=True)
+
+    later = ScrapeCheckpoint.load("freighter_arrivals", DATES, tmp_path, run_id="102")
+    assert later.cursor("2026-10-19") == (False, 0, None)
+    assert later.records() == []
+
+
+def test_without_a_run_id_nothing_is_resumed(tmp_path):
+    checkpoint = ScrapeCheckpoint.load("freighter_arrivals", DATES, tmp_path, run_id="")
+    checkpoint.save_page("2026-10-19", [], 40, None, done=True)
+    assert ScrapeCheckpoint.load("freighter_arrivals", DATES, tmp_path, run_id="").cursor("2026-10-19") == (False, 0, None)
+
+
+def test_other_dates_are_not_resumed(tmp_path):
+    checkpoint = ScrapeCheckpoint.load("freighter_arrivals", DATES, tmp_path, run_id="101")
+    checkpoint.save_page("2026-10-19", [], 40, None)
+    other = ScrapeCheckpoint.load("freighter_arrivals", ["2026-10-20"], tmp_path, run_id="101")
+    assert other.cursor("2026-10-20") == (False, 0, None)
+
+
+def test_clear_removes_the_file(tmp_path):
+    checkpoint = ScrapeCheckpoint.load("freighter_arrivals", DATES, tmp_path, run_id="101")
+    checkpoint.save_page("2026-10-19", [], 40, None, done=True)
+    checkpoint.save_page("2026-10-20", [], 12, None, done=True)
+    assert checkpoint.complete()
+    checkpoint.clear()
+    assert not (tmp_path / "freighter_arrival_flights_checkpoint.json").exists()
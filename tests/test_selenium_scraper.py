@@ -0,0 +1,75 @@
+from datetime import datetime
+
+import pytest
+
+selenium_scraper = pytest.importorskip("selenium_scraper")
+from scrape_checkpoint import ScrapeCheckpoint
+
+DATES = [datetime(2026, 10, 19, 8, 0), datetime(2026, 10, 20, 8, 0)]
+DATE_KEYS = ["2026-10-19", "2026-10-20"]
+
+
+def row(flight_number, time):
+    return {"time": time, "previous_time": None, "flight_number": flight_number, "airline_name": "Federal Express",
+            "place": "Guangzhou", "terminal": None, "belt_number": None, "gate_number": None, "flight_status": "ON SCHEDULE"}
+
+
+def day_rows(prefix, times):
+    return [row(f"{prefix}{n}", time) for n, time in enumerate(times)]
+
+
+@pytest.fixture
+def board(monkeypatch):
+    """Fakes the board page: lists[pick date] is the list shown after picking that date, loaded 5 rows at a time."""
+    state = {"lists": {}, "shown": [], "loaded": 0, "picks": []}
+
+    def page_to_row(board_name, date, index):
+        state["picks"].append(date.strftime('%Y-%m-%d'))
+        state["shown"] = state["lists"][date.strftime('%Y-%m-%d')]
+        state["loaded"] = min(max(index, 5), len(state["shown"]))
+
+    def read_rows(board_name, start):
+        return state["loaded"], state["shown"][start:state["loaded"]]
+
+    def load_more(count):
+        if state["loaded"] >= len(state["shown"]):
+            return False
+        state["loaded"] = min(state["loaded"] + 5, len(state["shown"]))
+        return True
+
+    monkeypatch.setattr(selenium_scraper, "page_to_row", page_to_row)
+    monkeypatch.setattr(selenium_scraper, "read_rows", read_rows)
+    monkeypatch.setattr(selenium_scraper, "load_more", load_more)
+    monkeypatch.setattr(selenium_scraper, "prune_rows", lambda end: 0)
+    monkeypatch.setattr(selenium_scraper, "memory_usage", lambda: (None, 0))
+    return state
+
+
+def scrape(tmp_path):
+    checkpoint = ScrapeCheckpoint.load("freighter_arrivals", DATE_KEYS, tmp_path, run_id="1")
+    for date in DATES:
+        selenium_scraper.scrape_flights_for_date("freighter_arrivals", date, checkpoint, DATES[-1])
+    return checkpoint
+
+
+def test_one_pick_covers_the_dates_its_list_runs_through(tmp_path, board):
+    board["lists"]["2026-10-19"] = (day_rows("A", ["06:00", "09:00", "13:00", "18:00", "23:30"])
+                                    + day_rows("B", ["00:15", "04:00", "10:00", "16:00", "22:00"])
+                                    + day_rows("C", ["01:00", "05:00"]))
+    checkpoint = scrape(tmp_path)
+
+    assert board["picks"] == ["2026-10-19"]
+    assert checkpoint.complete()
+    assert [flight["flight_id"] for flight in checkpoint.flights("2026-10-20")] == [
+        "B0_2026-10-20 00:15:00", "B1_2026-10-20 04:00:00", "B2_2026-10-20 10:00:00", "B3_2026-10-20 16:00:00", "B4_2026-10-20 22:00:00"]
+    assert len(checkpoint.flights("2026-10-19")) == 5
+
+
+def test_a_date_the_list_stops_inside_is_picked_again(tmp_path, board):
+    board["lists"]["2026-10-19"] = day_rows("A", ["06:00", "09:00", "13:00", "18:00", "23:30"]) + day_rows("B", ["00:15", "04:00"])
+    board["lists"]["2026-10-20"] = day_rows("B", ["00:15", "04:00", "10:00", "16:00", "22:00"]) + day_rows("C", ["01:00"])
+    checkpoint = scrape(tmp_path)
+
+    assert board["picks"] == ["2026-10-19", "2026-10-20"]
+    assert checkpoint.complete()
+    assert [flight["flight_number"] for flight in checkpoint.flights("2026-10-20")] == ["B0", "B1", "B2", "B3", "B4"]